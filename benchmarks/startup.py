@@ -0,0 +1,77 @@
+#!/usr/bin/python
+
+"""Startup time benchmark.
+
+Measures wall-clock time of importing the package and of starting the
+command line scripts (with --help, so everything they import is loaded)
+in a fresh interpreter, so import cost regressions are easy to spot. Usage:
+
+    $ python benchmarks/startup.py [-n RUNS] [--max-ms LIMIT]
+
+Exits with status 1 if any startup overhead (median, relative to a bare
+interpreter) exceeds LIMIT milliseconds.
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import time
+from optparse import OptionParser
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def script(name):
+    return [os.path.join(ROOT, 'bin', name), '--help']
+
+
+CASES = [
+    ('python (baseline)', ['-c', 'pass']),
+    ('import catchments', ['-c', 'import catchments']),
+    ('catchments-here.py', script('catchments-here.py')),
+    ('catchments-skobbler.py', script('catchments-skobbler.py')),
+    ('catchments-server.py', script('catchments-server.py')),
+]
+
+
+def measure(args, runs):
+    """Returns wall-clock times (ms) of running python with args in a fresh interpreter."""
+
+    # Scripts import the package from the working tree
+    env = dict(os.environ, PYTHONPATH=ROOT)
+
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.check_call(
+            [sys.executable] + args, cwd=ROOT, env=env, stdout=subprocess.DEVNULL
+        )
+        timings.append((time.perf_counter() - start) * 1000)
+
+    return timings
+
+
+def main():
+    parser = OptionParser()
+    parser.add_option('-n', '--runs', type='int', default=20)
+    parser.add_option('--max-ms', type='float', default=None)
+    (options, args) = parser.parse_args()
+
+    worst = 0.0
+    baseline = None
+    for label, args in CASES:
+        median = statistics.median(measure(args, options.runs))
+        if baseline is None:
+            baseline = median
+        else:
+            worst = max(worst, median - baseline)
+        print('{:<25} {:8.1f} ms'.format(label, median))
+
+    print('{:<25} {:8.1f} ms'.format('worst overhead', worst))
+
+    if options.max_ms is not None and worst > options.max_ms:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -3,7 +3,10 @@
 import os.path
 from catchments import HereAPI
 from catchments.parsers import create_here_parser
-from catchments.utils import load_input_data
+from catchments.batch import run_batch
+from catchments.sweep import parse_grid, run_sweep
+from catchments.utils import load_input_data, create_transport, format_summary, \
+    print_report, create_profiler
 
 
 def main():
@@ -26,32 +29,48 @@ def main():
 
     if not os.path.isfile(params['points']):
         parser.error('File doesn\'t exist')
+
+    try:
+        grid = parse_grid(params['grid'] or [])
+    except ValueError as e:
+        parser.error(str(e))
     
-    here_api = HereAPI(params['app_id'], params['app_code'])
+    transport = create_transport(params)
+
+    here_api = HereAPI(params['app_id'], params['app_code'], transport=transport)
+
+    profiler = create_profiler(params)
+    if profiler:
+        profiler.start()
 
     file = open(params['points'])
 
     points = load_input_data(file)
 
-    for point in points:
-
-        catchment = here_api.get_catchment(point, **params)
+    options = dict(
+        workers=params['workers'],
+        queue_size=params['queue_size'],
+        writers=params['writers'],
+        report=print_report,
+    )
 
-        if catchment:
-            geojson_feature = here_api.catchment_as_geojson(catchment)
-            if geojson_feature:
-                file_path = here_api.save_as_geojson(geojson_feature)
-                print('{} file has been created.'.format(file_path))
-            else:
-                print('Couldn\'t proccess catchment for {},{} to GeoJSON (Invalid API response)'.format(
-                    point['lat'], point['lon']
-                ))
-        else:
-            print('Couldn\'t get catchment for {},{} coordinates (HTTP Error).'.format(
-                point['lat'], point['lon'])
-            )
+    if grid:
+        results = run_sweep(here_api, points, grid, params, **options)
+    else:
+        run_batch(here_api, points, params, **options)
 
     file.close()
+    transport.close()
+
+    if profiler:
+        for path in profiler.stop():
+            print('{} profile has been created.'.format(path))
+
+    if grid:
+        for name, result in results.items():
+            print('{}: {}'.format(name, format_summary(result['stats'])))
+
+    print('Run statistics: {}'.format(format_summary(transport.summary())))
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,64 @@
+#!/usr/bin/python
+
+from catchments import HereAPI, SkobblerAPI
+from catchments.parsers import create_server_parser
+from catchments.server import CatchmentServer, CatchmentService, TTLCache
+from catchments.utils import create_transport, create_profiler
+
+
+def main():
+    """Serve catchments from HERE and/or Skobbler APIs over HTTP.
+
+    All callers share one connection pool, cache, rate limiter
+    and circuit breakers. Identical concurrent requests are coalesced.
+
+    """
+
+    parser = create_server_parser()
+
+    (options, args) = parser.parse_args()
+    params = vars(options)
+
+    here = params['here_app_id'] and params['here_app_code']
+
+    if not (here or params['skobbler_key']):
+        parser.error('Missing required param')
+
+    transport = create_transport(params)
+
+    apis = {}
+    if here:
+        apis['here'] = HereAPI(
+            params['here_app_id'], params['here_app_code'], transport=transport
+        )
+    if params['skobbler_key']:
+        apis['skobbler'] = SkobblerAPI(params['skobbler_key'], transport=transport)
+
+    service = CatchmentService(
+        apis,
+        cache=TTLCache(size=params['cache_size'], ttl=params['cache_ttl']),
+        workers=params['workers'],
+    )
+
+    server = CatchmentServer((params['host'], params['port']), service)
+
+    profiler = create_profiler(params)
+    if profiler:
+        profiler.start()
+
+    print('Serving catchments on http://{}:{}/'.format(*server.server_address[:2]))
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+        transport.close()
+        if profiler:
+            for path in profiler.stop():
+                print('{} profile has been created.'.format(path))
+
+if __name__ == '__main__':
+    main()
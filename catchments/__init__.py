@@ -1,2 +1,42 @@
-from catchments.skobbler import *
-from catchments.here import *
+import sys
+from importlib import import_module
+
+
+# Public names mapped to the modules that define them. Provider modules
+# (and, through them, `requests`) are imported on first attribute access,
+# so `import catchments` and the command line scripts start quickly.
+_LAZY_ATTRIBUTES = {
+    'SkobblerAPI': 'catchments.skobbler',
+    'HereAPI': 'catchments.here',
+    'CompositeAPI': 'catchments.composite',
+    'Point': 'catchments.models',
+    'Catchment': 'catchments.models',
+}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name):
+    try:
+        module_name = _LAZY_ATTRIBUTES[name]
+    except KeyError:
+        raise AttributeError(
+            'module {!r} has no attribute {!r}'.format(__name__, name)
+        )
+
+    value = getattr(import_module(module_name), name)
+    globals()[name] = value
+
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
+
+# Module level __getattr__ (PEP 562) is available since Python 3.7
+if sys.version_info < (3, 7):
+    from catchments.skobbler import *
+    from catchments.here import *
+    from catchments.composite import CompositeAPI
+    from catchments.models import Point, Catchment
@@ -0,0 +1,157 @@
+import logging
+import threading
+from collections import Counter, defaultdict
+from catchments.profiling import span, iter_spans
+from catchments.writer import GeoJSONWriter
+
+
+logger = logging.getLogger(__name__)
+
+class Pipeline(object):
+    """Requests catchments with a pool of fetch workers and saves them
+    as GeoJSON files with a dedicated writer thread.
+
+    :param api (API object): HereAPI, SkobblerAPI or CompositeAPI
+
+    :param workers (int): number of fetch workers
+
+    :param save_in (path): default directory for *.geojson files
+
+    :param queue_size (int): maximum number of features waiting to be saved
+
+    :param writers (int): number of writer threads
+
+    :param report (callable): called with (status, point, detail) for every
+        point, status is one of 'created' (detail - file path),
+        'http_error', 'invalid' (detail - exception if raised),
+        'write_error' or 'error' (detail - exception, unexpected ones are logged)
+
+    Stats of points submitted with a group are also counted in groups[group].
+    """
+
+    def __init__(self, api, workers=4, save_in=None, queue_size=1000,
+                 writers=4, report=None):
+        from concurrent.futures import ThreadPoolExecutor
+
+        self.api = api
+        self.save_in = save_in
+        self.stats = Counter()
+        self.groups = defaultdict(Counter)
+        self.user_report = report
+        self._lock = threading.Lock()
+        # Limits points waiting for fetch workers
+        self._slots = threading.BoundedSemaphore(2 * workers)
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix='catchments-fetch'
+        )
+        self.writer = GeoJSONWriter(
+            queue_size=queue_size, threads=writers, report=self.report
+        ).start()
+
+    def report(self, status, point, detail=None, group=None):
+        with self._lock:
+            self.stats[status] += 1
+            if group is not None:
+                self.groups[group][status] += 1
+        if self.user_report is not None:
+            try:
+                self.user_report(status, point, detail)
+            except Exception:
+                logger.exception('Report callback failed')
+
+    @property
+    def expired(self):
+        """True if API transport's batch deadline has passed."""
+
+        deadline = getattr(getattr(self.api, 'transport', None), 'deadline', None)
+
+        return deadline is not None and deadline.expired
+
+    def _process(self, point, params, save_in, group):
+        try:
+            catchment = self.api.get_catchment(point, **params)
+            if catchment is None:
+                self.report('http_error', point, group=group)
+                return
+
+            with span('convert', point):
+                catchment = self.api.catchment_as_compact(catchment)
+            if catchment is None:
+                self.report('invalid', point, group=group)
+                return
+
+            # Compact Catchment waits in the queue, GeoJSON is built by writer
+            self.writer.write(self.api, catchment, point, save_in, group)
+        except ValueError as e:
+            # Undecodable or malformed API response
+            self.report('invalid', point, e, group)
+        except Exception as e:
+            logger.exception('Couldn\'t process point %r', point)
+            self.report('error', point, e, group)
+        finally:
+            self._slots.release()
+
+    def submit(self, point, params=None, save_in=None, group=None):
+        """Schedules point, blocks while all fetch workers are busy.
+
+        :param point (dictionary or Point)
+
+        :param params (dictionary): API params
+
+        :param save_in (path): directory for *.geojson file,
+            pipeline's save_in is used if not supplied
+
+        :param group (hashable): stats group of the point
+        """
+
+        self._slots.acquire()
+        self._executor.submit(
+            self._process, point, params or {}, save_in or self.save_in, group
+        )
+
+    def close(self):
+        """Waits for scheduled points and saves remaining features.
+
+        Returns:
+            stats (Counter): number of points per status
+        """
+
+        self._executor.shutdown(wait=True)
+        self.writer.close()
+
+        return self.stats
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def run_batch(api, points, params=None, **options):
+    """Gets catchments for points and saves them as *.geojson files.
+
+    Stops scheduling points when API transport's batch deadline has passed
+    (reported once with 'deadline_exceeded' status).
+
+    :param api (API object): HereAPI, SkobblerAPI or CompositeAPI
+
+    :param points (iterable): point dictionaries or Point objects
+
+    :param params (dictionary): API params
+
+    :param options (**dictionary): Pipeline options
+        (workers, save_in, queue_size, writers, report)
+
+    Returns:
+        stats (Counter): number of points per status
+    """
+
+    with Pipeline(api, **options) as pipeline:
+        for point in iter_spans(points, 'read_csv'):
+            if pipeline.expired:
+                pipeline.report('deadline_exceeded', point)
+                break
+            pipeline.submit(point, params)
+
+    return pipeline.stats
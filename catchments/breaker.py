@@ -0,0 +1,110 @@
+import threading
+import time
+from collections import deque
+
+
+class CircuitBreaker(object):
+    """Circuit breaker guarding single API endpoint.
+
+    Breaker opens when the error rate of recent calls reaches failure_rate.
+    While open, calls are rejected. After reset_timeout it becomes
+    half-open and lets trial calls through - successful trial closes
+    the breaker, failed one opens it again.
+
+    :param failure_rate (float): error rate (0 - 1) that opens the breaker
+
+    :param window (int): number of recent calls the error rate is computed from
+
+    :param min_calls (int): calls needed in window before breaker may open
+
+    :param reset_timeout (float): seconds before open breaker lets trial calls through
+
+    :param half_open_calls (int): concurrent trial calls allowed while half-open
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+    # Seconds to wait for a trial call slot while half-open
+    poll_interval = 0.1
+
+    def __init__(self, failure_rate=0.5, window=20, min_calls=10,
+                 reset_timeout=30.0, half_open_calls=1, clock=time.monotonic):
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.reset_timeout = reset_timeout
+        self.half_open_calls = half_open_calls
+        self.clock = clock
+        self.calls = deque(maxlen=window)
+        self.opened = 0
+        self._state = self.CLOSED
+        self._opened_at = None
+        self._trials = 0
+        self._lock = threading.Lock()
+
+    def _update(self):
+        if self._state == self.OPEN and \
+                self.clock() - self._opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+            self._trials = 0
+
+    @property
+    def state(self):
+        with self._lock:
+            self._update()
+            return self._state
+
+    def allow(self):
+        """Returns True if a call may be sent now."""
+
+        with self._lock:
+            self._update()
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.HALF_OPEN and self._trials < self.half_open_calls:
+                self._trials += 1
+                return True
+            return False
+
+    def wait_time(self):
+        """Returns seconds until the breaker may let a call through."""
+
+        with self._lock:
+            self._update()
+            if self._state == self.CLOSED:
+                return 0.0
+            if self._state == self.OPEN:
+                return max(0.0, self._opened_at + self.reset_timeout - self.clock())
+            return self.poll_interval
+
+    def _open(self):
+        self._state = self.OPEN
+        self._opened_at = self.clock()
+        self.opened += 1
+
+    def record_success(self):
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._state = self.CLOSED
+                self.calls.clear()
+            self.calls.append(True)
+
+    def record_failure(self):
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._open()
+                return
+            self.calls.append(False)
+            if self._state == self.CLOSED and len(self.calls) >= self.min_calls:
+                failures = self.calls.count(False)
+                if failures / len(self.calls) >= self.failure_rate:
+                    self._open()
+
+    def summary(self):
+        """Returns breaker state and counters (dictionary)."""
+
+        return {
+            'state': self.state,
+            'opened': self.opened,
+        }
@@ -0,0 +1,300 @@
+import threading
+from collections import Counter
+from catchments.models import Catchment
+
+
+# Transport types supported by both providers (SKOBBLER name: HERE name)
+TRANSPORT_TYPES = {'car': 'car', 'pedestrian': 'pedestrian'}
+
+# SKOBBLER units: HERE rangetype
+RANGE_TYPES = {'sec': 'time', 'meter': 'distance'}
+
+
+def _inverse(mapping):
+    return dict((value, key) for key, value in mapping.items())
+
+
+def here_params(params):
+    """Maps params to HERE vocabulary.
+
+    HERE params ('mode', 'rangetype') are kept as they are, missing ones
+    are created from SKOBBLER params ('transport', 'units').
+
+    :param params (dictionary)
+
+    Returns:
+        params (dictionary) if HERE can serve the request, None otherwise.
+    """
+
+    mapped = dict(params)
+
+    if 'mode' not in params and 'transport' in params:
+        transport = TRANSPORT_TYPES.get(params['transport'])
+        if transport is None:
+            return None
+        mapped['mode'] = 'fastest;{};traffic:disabled'.format(transport)
+
+    if 'rangetype' not in params and 'units' in params:
+        rangetype = RANGE_TYPES.get(params['units'])
+        if rangetype is None:
+            return None
+        mapped['rangetype'] = rangetype
+
+    return mapped
+
+
+def skobbler_params(params):
+    """Maps params to SKOBBLER vocabulary.
+
+    SKOBBLER params ('transport', 'units') are kept as they are, missing
+    ones are created from HERE params ('mode', 'rangetype').
+
+    :param params (dictionary)
+
+    Returns:
+        params (dictionary) if SKOBBLER can serve the request, None otherwise.
+    """
+
+    mapped = dict(params)
+
+    if 'transport' not in params and 'mode' in params:
+        mode = params['mode'].split(';')
+        transport = _inverse(TRANSPORT_TYPES).get(mode[1] if len(mode) > 1 else None)
+        if transport is None:
+            return None
+        mapped['transport'] = transport
+
+    if 'units' not in params and 'rangetype' in params:
+        units = _inverse(RANGE_TYPES).get(params['rangetype'])
+        if units is None:
+            return None
+        mapped['units'] = units
+
+    return mapped
+
+
+PARAMS_MAPPERS = {
+    'HERE': here_params,
+    'SKOBBLER': skobbler_params,
+}
+
+
+class CompositeAPI(object):
+    """The CompositeAPI object requests catchments from multiple API providers.
+
+    :param apis (list): API objects (e.g. HereAPI, SkobblerAPI),
+        in failover mode the first one is primary
+
+    :param mode (string):
+        'failover' - next API is used if previous one fails,
+        'race' - all APIs are requested at once, first success wins,
+        'balance' - requests are spread across APIs by weights,
+        next API is used if chosen one fails
+
+    :param weights (list): API weights for 'balance' mode (equal by default)
+
+    :param max_workers (int): threads sending 'race' mode requests, should be
+        at least the number of concurrent callers times number of APIs
+        (losing requests hold their threads until they finish)
+    """
+
+    FAILOVER = 'failover'
+    RACE = 'race'
+    BALANCE = 'balance'
+
+    def __init__(self, apis, mode='failover', weights=None, max_workers=None):
+        if mode not in (self.FAILOVER, self.RACE, self.BALANCE):
+            raise ValueError('Unknown mode: {}'.format(mode))
+
+        self.apis = list(apis)
+        self.mode = mode
+        self.weights = list(weights) if weights else [1] * len(self.apis)
+        self.max_workers = max_workers or 4 * len(self.apis)
+        self.stats = Counter()
+        self._current_weights = [0] * len(self.apis)
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def _count(self, key, value=1):
+        with self._lock:
+            self.stats[key] += value
+
+    def _candidates(self, params):
+        candidates = []
+        for api in self.apis:
+            mapper = PARAMS_MAPPERS.get(api.provider)
+            api_params = mapper(params) if mapper else dict(params)
+            if api_params is not None:
+                candidates.append((api, api_params))
+        return candidates
+
+    def _balanced(self, candidates):
+        # Smooth weighted round-robin, chosen API goes first
+        with self._lock:
+            total = 0
+            best = None
+            for i, api in enumerate(self.apis):
+                if not any(api is candidate for candidate, _ in candidates):
+                    continue
+                self._current_weights[i] += self.weights[i]
+                total += self.weights[i]
+                if best is None or self._current_weights[i] > self._current_weights[best]:
+                    best = i
+            self._current_weights[best] -= total
+
+        chosen = self.apis[best]
+
+        return sorted(candidates, key=lambda candidate: candidate[0] is not chosen)
+
+    def _request(self, api, point, params):
+        try:
+            catchment = api.get_catchment(point, **params)
+        except Exception:
+            # E.g. undecodable response, provider is treated as failing
+            self._count('errors')
+            return None
+        if catchment is not None:
+            catchment['provider'] = api.provider
+        return catchment
+
+    def _sequential(self, point, candidates):
+        for i, (api, params) in enumerate(candidates):
+            if i > 0:
+                self._count('failovers')
+            catchment = self._request(api, point, params)
+            if catchment is not None:
+                return catchment
+        return None
+
+    def _race(self, point, candidates):
+        from concurrent.futures import ThreadPoolExecutor, as_completed
+
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix='catchments-race'
+                )
+
+        futures = [
+            self._executor.submit(self._request, api, point, params)
+            for api, params in candidates
+        ]
+        for i, future in enumerate(as_completed(futures)):
+            catchment = future.result()
+            if catchment is not None:
+                # Requests still waiting for a thread aren't sent
+                for other in futures:
+                    other.cancel()
+                return catchment
+            if i < len(futures) - 1:
+                self._count('failovers')
+        return None
+
+    def get_catchment(self, point, **params):
+        """Requests catchment from API providers.
+
+        :param point (dictionary or Point):
+            {'name': 'place', 'lon': 50.0, 'lat': 20.0}
+            'name' key is optional, 'lon' and 'lat' are required.
+
+        :param params (**dictionary):
+            params of any supported API provider, 'range', 'transport'
+            (SKOBBLER) / 'mode' (HERE) and 'units' (SKOBBLER) /
+            'rangetype' (HERE) are mapped between providers.
+            Providers that can't serve given params are skipped.
+
+        Returns:
+            API response tagged with 'provider' key if successful, None otherwise.
+        """
+
+        candidates = self._candidates(params)
+
+        if not candidates:
+            return None
+
+        if self.mode == self.RACE:
+            catchment = self._race(point, candidates)
+        elif self.mode == self.BALANCE:
+            catchment = self._sequential(point, self._balanced(candidates))
+        else:
+            catchment = self._sequential(point, candidates)
+
+        if catchment is not None:
+            self._count(catchment['provider'])
+
+        return catchment
+
+    def _api(self, provider):
+        for api in self.apis:
+            if api.provider == provider:
+                return api
+        raise ValueError('Unknown provider: {}'.format(provider))
+
+    def catchment_as_compact(self, catchment):
+        """Processing catchment to compact Catchment object.
+
+        :param catchment (dictionary): response tagged with 'provider' key
+
+        Returns:
+            Catchment if successful, None otherwise.
+        """
+
+        return self._api(catchment['provider']).catchment_as_compact(catchment)
+
+    def catchment_as_geojson(self, catchment):
+        """Processing catchment to GeoJSON format.
+
+        :param catchment (dictionary or Catchment)
+
+        Returns:
+            GeoJSON polygon feature with 'provider' property if successful,
+            None otherwise.
+        """
+
+        if not isinstance(catchment, Catchment):
+            catchment = self.catchment_as_compact(catchment)
+
+        if catchment is None:
+            return None
+
+        geojson = catchment.geojson
+        geojson['properties']['provider'] = catchment.provider
+
+        return geojson
+
+    def save_as_geojson(self, geojson, save_in=None):
+        """Save GeoJSON feature to *.geojson file.
+
+        :param geojson (dictionary - GeoJSON feature with 'provider' property)
+
+        :param save_in (path)
+
+        Returns:
+           File with GeoJSON feature
+           path_to_save: saved *.geojson file path
+        """
+
+        api = self._api(geojson['properties']['provider'])
+
+        return api.save_as_geojson(geojson, save_in=save_in)
+
+    def close(self):
+        """Shuts down 'race' mode executor, running requests aren't waited for."""
+
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def summary(self):
+        """Returns run statistics (dictionary): catchments served
+        by each provider, number of failovers and provider errors."""
+
+        with self._lock:
+            return dict(self.stats)
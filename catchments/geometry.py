@@ -0,0 +1,230 @@
+# Polygon ring validation and repair. NumPy is used (if installed)
+# to find self-intersections of large rings, it is imported on first use.
+
+# Rings with fewer vertices are checked in pure Python, NumPy overhead
+# doesn't pay off for them
+NUMPY_MIN_VERTICES = 64
+
+# Segments paired with their sweep candidates at once with NumPy
+NUMPY_BLOCK_SIZE = 1024
+
+# Maximum number of self-intersections fixed per ring
+MAX_INTERSECTION_FIXES = 100
+
+# Rings with smaller absolute area (square degrees) are degenerate,
+# their orientation isn't changed
+AREA_TOLERANCE = 1e-12
+
+_numpy = None
+
+
+def _import_numpy():
+    global _numpy
+    if _numpy is None:
+        try:
+            import numpy
+        except ImportError:
+            numpy = False
+        _numpy = numpy
+    return _numpy
+
+
+def _orientation(ax, ay, bx, by, cx, cy):
+    value = (bx - ax) * (cy - ay) - (by - ay) * (cx - ax)
+    return (value > 0) - (value < 0)
+
+
+def _find_crossing_python(vertices):
+    n = len(vertices)
+    segments = []
+    for i in range(n):
+        (ax, ay), (bx, by) = vertices[i], vertices[(i + 1) % n]
+        segments.append((min(ax, bx), max(ax, bx), min(ay, by), max(ay, by), i))
+    segments.sort()
+
+    # Sweep along x axis, only segments with overlapping x ranges are compared.
+    # All crossings are collected, the smallest pair is returned (as with NumPy)
+    found = None
+    active = []
+    for min_x, max_x, min_y, max_y, i in segments:
+        active = [segment for segment in active if segment[1] >= min_x]
+        (ax, ay), (bx, by) = vertices[i], vertices[(i + 1) % n]
+        for _, _, other_min_y, other_max_y, j in active:
+            if other_max_y < min_y or other_min_y > max_y:
+                continue
+            (cx, cy), (dx, dy) = vertices[j], vertices[(j + 1) % n]
+            # Proper crossing only, touching and collinear segments are allowed
+            if _orientation(ax, ay, bx, by, cx, cy) * _orientation(ax, ay, bx, by, dx, dy) < 0 and \
+                    _orientation(cx, cy, dx, dy, ax, ay) * _orientation(cx, cy, dx, dy, bx, by) < 0:
+                crossing = (min(i, j), max(i, j))
+                if found is None or crossing < found:
+                    found = crossing
+        active.append((min_x, max_x, min_y, max_y, i))
+
+    return found
+
+
+def _find_crossing_numpy(np, vertices):
+    start = np.asarray(vertices, dtype=float)
+    end = np.roll(start, -1, axis=0)
+    n = len(start)
+
+    min_x, max_x = np.minimum(start[:, 0], end[:, 0]), np.maximum(start[:, 0], end[:, 0])
+    min_y, max_y = np.minimum(start[:, 1], end[:, 1]), np.maximum(start[:, 1], end[:, 1])
+
+    # Vectorized sweep along x axis: segments sorted by min_x, every segment
+    # is paired with following ones starting before it ends
+    order = np.argsort(min_x, kind='stable')
+    stop = np.searchsorted(min_x[order], max_x[order], side='right')
+    counts = np.maximum(stop - np.arange(n) - 1, 0)
+
+    def side(a, b, point):
+        # Orientation of points against segments (a, b)
+        return np.sign(
+            (b[:, 0] - a[:, 0]) * (point[:, 1] - a[:, 1]) -
+            (b[:, 1] - a[:, 1]) * (point[:, 0] - a[:, 0])
+        )
+
+    found = []
+    for block in range(0, n, NUMPY_BLOCK_SIZE):
+        block_counts = counts[block:block + NUMPY_BLOCK_SIZE]
+        total = int(block_counts.sum())
+        if not total:
+            continue
+
+        positions = np.arange(block, block + len(block_counts))
+        first = np.repeat(positions, block_counts)
+        offsets = np.arange(total) - np.repeat(np.cumsum(block_counts) - block_counts, block_counts)
+        i, j = order[first], order[first + 1 + offsets]
+
+        overlap = (min_y[i] <= max_y[j]) & (min_y[j] <= max_y[i])
+        i, j = i[overlap], j[overlap]
+
+        # Proper crossing only, touching and collinear segments are allowed
+        crossing = (
+            (side(start[i], end[i], start[j]) * side(start[i], end[i], end[j]) < 0) &
+            (side(start[j], end[j], start[i]) * side(start[j], end[j], end[i]) < 0)
+        )
+        if crossing.any():
+            i, j = i[crossing], j[crossing]
+            found.extend(zip(np.minimum(i, j).tolist(), np.maximum(i, j).tolist()))
+
+    return min(found) if found else None
+
+
+def find_self_intersection(vertices, use_numpy=None):
+    """Finds pair of crossing segments of a ring.
+
+    :param vertices (list): ring vertices [[lon, lat], ...] without closing vertex,
+        segment i connects vertex i and i + 1 (last one connects last and first vertex)
+
+    :param use_numpy (bool): None - use NumPy for large rings if it is installed
+
+    Returns:
+        (i, j) indices of crossing segments (i < j), the smallest pair
+        if there are many, None if ring is simple.
+    """
+
+    if use_numpy is None:
+        use_numpy = len(vertices) >= NUMPY_MIN_VERTICES
+
+    np = _import_numpy() if use_numpy else None
+
+    if np:
+        return _find_crossing_numpy(np, vertices)
+
+    return _find_crossing_python(vertices)
+
+
+def signed_area(vertices):
+    """Returns signed area of a ring (positive if counterclockwise)."""
+
+    if not vertices:
+        return 0.0
+
+    # Relative to the first vertex, to limit floating point cancellation
+    x0, y0 = vertices[0]
+    area = 0.0
+    n = len(vertices)
+    for i in range(n):
+        (ax, ay), (bx, by) = vertices[i], vertices[(i + 1) % n]
+        area += (ax - x0) * (by - y0) - (bx - x0) * (ay - y0)
+
+    return area / 2.0
+
+
+def repair_ring(coordinates, use_numpy=None, closed=True):
+    """Validates and repairs polygon exterior ring.
+
+    Consecutive duplicate vertices are removed, crossing segments are
+    uncrossed (by reversing the part of the ring between them),
+    ring is made counterclockwise (RFC 7946) and closed. Rings with fewer
+    than 3 distinct vertices can't be repaired, they are flagged as
+    'degenerate_ring'.
+
+    :param coordinates (list): flat list of ring coordinates [lon, lat, lon, lat, ...]
+
+    :param use_numpy (bool): None - use NumPy for large rings if it is installed
+
+    :param closed (bool): False if provider doesn't repeat the first vertex,
+        closing such rings isn't reported as a fix
+
+    Returns:
+        (coordinates, fixes):
+            coordinates - flat list of repaired, closed ring coordinates
+            fixes (dictionary) - number of applied fixes by type:
+                'duplicate_vertices', 'unclosed_ring', 'self_intersections',
+                'orientation', 'unresolved_self_intersections', 'degenerate_ring'
+    """
+
+    fixes = {}
+
+    vertices = [
+        (coordinates[i], coordinates[i + 1])
+        for i in range(0, len(coordinates) - 1, 2)
+    ]
+
+    if not vertices:
+        fixes['degenerate_ring'] = 1
+        return [], fixes
+
+    if vertices[0] == vertices[-1] and len(vertices) > 1:
+        vertices.pop()
+    elif closed:
+        fixes['unclosed_ring'] = 1
+
+    deduped = [vertices[0]]
+    for vertex in vertices[1:]:
+        if vertex != deduped[-1]:
+            deduped.append(vertex)
+    while len(deduped) > 1 and deduped[-1] == deduped[0]:
+        deduped.pop()
+    if len(deduped) < len(vertices):
+        fixes['duplicate_vertices'] = len(vertices) - len(deduped)
+    vertices = deduped
+
+    if len(set(vertices)) < 3:
+        fixes['degenerate_ring'] = 1
+
+    if len(vertices) >= 4 and 'degenerate_ring' not in fixes:
+        for _ in range(MAX_INTERSECTION_FIXES):
+            crossing = find_self_intersection(vertices, use_numpy)
+            if crossing is None:
+                break
+            i, j = crossing
+            vertices[i + 1:j + 1] = vertices[i + 1:j + 1][::-1]
+            fixes['self_intersections'] = fixes.get('self_intersections', 0) + 1
+        else:
+            if find_self_intersection(vertices, use_numpy) is not None:
+                fixes['unresolved_self_intersections'] = 1
+
+    if signed_area(vertices) < -AREA_TOLERANCE:
+        vertices = vertices[:1] + vertices[:0:-1]
+        fixes['orientation'] = 1
+
+    ring = []
+    for lon, lat in vertices + vertices[:1]:
+        ring.append(lon)
+        ring.append(lat)
+
+    return ring, fixes
@@ -1,24 +1,37 @@
 import os
-import csv
-import json
-import requests
+from catchments.geometry import repair_ring
+from catchments.models import Catchment
+from catchments.profiling import span
+from catchments.transport import Transport, TransportError
+from catchments.utils import atomic_write
 
 
 class HereAPI(object):
     """The HereAPI object implements HERE Isolines API."""
 
-    def __init__(self, app_id, app_code):
+    provider = 'HERE'
+
+    url = 'https://isoline.route.cit.api.here.com/routing/7.2/calculateisoline.json'
+
+    def __init__(self, app_id, app_code, transport=None, url=None):
         self.app_id = app_id
         self.app_code = app_code
+        self.transport = transport or Transport()
+        if url:
+            self.url = url
 
     def _request(self, url, point, params):
+        # Imported here, so importing the package doesn't pay for requests
+        import requests
+
         try:
-            r = requests.get(url, params=params)
-            r.raise_for_status()
-        except requests.HTTPError:
+            with span('request', point):
+                r = self.transport.get(url, params=params, endpoint=self.provider)
+        except (requests.RequestException, TransportError):
             return None
 
-        catchment = r.json()
+        with span('decode', point):
+            catchment = r.json()
 
         catchment['name'] = point.get(
             'name', '{}_{}'.format(point['lat'], point['lon'])
@@ -29,7 +42,8 @@ class HereAPI(object):
     def get_catchment(self, point, **params):
         """Requests catchment from API provider.
 
-        :param point (dictionary): {'name': 'place', 'lon': 50.0, 'lat': 20.0}
+        :param point (dictionary or Point):
+            {'name': 'place', 'lon': 50.0, 'lat': 20.0}
             'name' key is optional, 'lon' and 'lat' are required.
 
         :param params (**dictionary):
@@ -42,8 +56,6 @@ class HereAPI(object):
             API response if successful, None otherwise.
         """
 
-        url = 'https://isoline.route.cit.api.here.com/routing/7.2/calculateisoline.json'
-
         request_params = {}
 
         request_params['start'] = 'geo!{1},{0}'.format(point['lon'], point['lat'])
@@ -58,29 +70,21 @@ class HereAPI(object):
 
         request_params['app_code'] = self.app_code
 
-        return self._request(url, point, request_params)
+        return self._request(self.url, point, request_params)
 
     @staticmethod
-    def catchment_as_geojson(catchment):
-        """Processing catchment to GeoJSON format.
+    def catchment_as_compact(catchment):
+        """Processing catchment to compact Catchment object.
 
         :param catchment (dictionary)
 
         Returns:
-            GeoJSON polygon feature if successful, None otherwise.
+            Catchment if successful, None otherwise.
         """
 
-        geojson = {
-            "type": "Feature",
-            "geometry": {
-                "type": "Polygon", "coordinates": [[]]
-            },
-            "properties": {}
-        }
-
         try:
             shape = catchment['response']['isoline'][0]['component'][0]['shape']
-        except KeyError:
+        except (KeyError, IndexError):
             return None
 
         coords = []
@@ -89,19 +93,35 @@ class HereAPI(object):
             coords.append(float(lat_lon[1]))
             coords.append(float(lat_lon[0]))
 
-        for i, coord in enumerate(coords):
-            if (i % 2 == 0):
-                geojson['geometry']['coordinates'][0].append(
-                    [coord, coords[i + 1]]
-                )
+        coords, fixes = repair_ring(coords)
+        if 'degenerate_ring' in fixes:
+            return None
+
+        return Catchment(
+            catchment['name'], coords, provider=HereAPI.provider, fixes=fixes
+        )
+
+    @staticmethod
+    def catchment_as_geojson(catchment):
+        """Processing catchment to GeoJSON format.
+
+        :param catchment (dictionary or Catchment)
+
+        Returns:
+            GeoJSON polygon feature if successful, None otherwise.
+        """
+
+        if not isinstance(catchment, Catchment):
+            catchment = HereAPI.catchment_as_compact(catchment)
 
-        geojson['properties']['name'] = catchment['name']
+        if catchment is None:
+            return None
 
-        return geojson
+        return catchment.geojson
 
     @staticmethod
     def save_as_geojson(geojson, save_in=None):
-        """Save GeoJSON feature to *.geojson file.
+        """Save GeoJSON feature to *.geojson file (atomically).
 
         :param geojson (dictionary - GeoJSON feature)
 
@@ -112,16 +132,15 @@ class HereAPI(object):
            path_to_save: saved *.geojson file path
         """
 
-        name = 'HERE_{}.geojson'.format(geojson['properties']['name'])
+        name = '{}_{}.geojson'.format(HereAPI.provider, geojson['properties']['name'])
 
         if save_in:
             path_to_save = os.path.join(save_in, name)
         else:
             path_to_save = os.path.join(os.getcwd(), name)
 
-        feature = json.dumps(geojson, indent=2)
+        import json
 
-        with open(path_to_save, 'w') as f:
-            f.write(feature)
+        feature = json.dumps(geojson, indent=2)
 
-        return path_to_save
+        return atomic_write(path_to_save, feature)
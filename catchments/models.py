@@ -0,0 +1,129 @@
+from array import array
+
+
+class Point(object):
+    """Compact point with float coordinates.
+
+    Point supports read-only dictionary access ('lat', 'lon', 'name'),
+    so it can be passed to get_catchment methods instead of
+    a point dictionary.
+    """
+
+    __slots__ = ('lat', 'lon', 'name')
+
+    _keys = ('name', 'lat', 'lon')
+
+    def __init__(self, lat, lon, name=None):
+        self.lat = float(lat)
+        self.lon = float(lon)
+        self.name = name
+
+    @classmethod
+    def from_dict(cls, point, default_name=False):
+        """Creates Point from point dictionary.
+
+        :param point (dictionary):
+            {'name': 'place', 'lon': 50.0, 'lat': 20.0}
+            'name' key is optional, 'lon' and 'lat' are required.
+
+        :param default_name (bool): name unnamed point 'lat_lon' using
+            original coordinates (e.g. '52.40_16.93' strings from *.csv file),
+            so file names match the ones of point dictionaries
+
+        Returns:
+            Point
+        """
+
+        name = point.get('name')
+        if name is None and default_name:
+            name = '{}_{}'.format(point['lat'], point['lon'])
+
+        return cls(point['lat'], point['lon'], name)
+
+    def __getitem__(self, key):
+        if key not in self._keys or getattr(self, key) is None:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def __iter__(self):
+        return (key for key in self._keys if key in self)
+
+    def keys(self):
+        return list(self)
+
+    def __eq__(self, other):
+        if not isinstance(other, Point):
+            return NotImplemented
+        return (self.lat, self.lon, self.name) == (other.lat, other.lon, other.name)
+
+    def __hash__(self):
+        return hash((self.lat, self.lon, self.name))
+
+    def __repr__(self):
+        return 'Point(lat={!r}, lon={!r}, name={!r})'.format(
+            self.lat, self.lon, self.name
+        )
+
+
+class Catchment(object):
+    """Compact catchment polygon.
+
+    Ring vertices are kept in a flat array of doubles
+    [lon, lat, lon, lat, ...] instead of the API response.
+    GeoJSON feature is built on access.
+
+    fixes (dictionary) holds number of geometry fixes applied
+    to the ring by type (see catchments.geometry.repair_ring).
+    """
+
+    __slots__ = ('name', 'provider', 'coordinates', 'fixes')
+
+    def __init__(self, name, coordinates, provider=None, fixes=None):
+        self.name = name
+        self.coordinates = array('d', coordinates)
+        self.provider = provider
+        self.fixes = fixes or {}
+
+    def __len__(self):
+        return len(self.coordinates) // 2
+
+    def vertices(self):
+        """Iterates over ring vertices as [lon, lat] lists."""
+
+        coords = self.coordinates
+        for i in range(0, len(coords) - 1, 2):
+            yield [coords[i], coords[i + 1]]
+
+    @property
+    def geojson(self):
+        """GeoJSON polygon feature (built on every access).
+
+        Applied geometry fixes are listed in 'fixes' property (if any).
+        """
+
+        geojson = {
+            "type": "Feature",
+            "geometry": {
+                "type": "Polygon", "coordinates": [list(self.vertices())]
+            },
+            "properties": {"name": self.name}
+        }
+
+        if self.fixes:
+            geojson['properties']['fixes'] = dict(self.fixes)
+
+        return geojson
+
+    def __repr__(self):
+        return 'Catchment(name={!r}, provider={!r}, vertices={})'.format(
+            self.name, self.provider, len(self)
+        )
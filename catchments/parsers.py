@@ -1,4 +1,109 @@
-from optparse import OptionParser
+from optparse import OptionParser, OptionGroup
+
+
+def add_transport_options(parser):
+    """Adds timeout, deadline, hedging and circuit breaker options to parser.
+
+    :param parser (optparse.OptionParser)
+
+    Returns:
+        parser (optparse.OptionParser)
+    """
+
+    group = OptionGroup(parser, 'Transport options')
+    group.add_option(
+        '--connect-timeout', type='float', default=3.05,
+        help='Connect timeout in seconds (float)'
+    )
+    group.add_option(
+        '--timeout', type='float', default=30.0,
+        help='Read timeout in seconds (float)'
+    )
+    group.add_option(
+        '--deadline', type='float', default=None,
+        help='Overall batch deadline in seconds (float)'
+    )
+    group.add_option(
+        '--hedge', type='float', default=None,
+        help='''Send duplicate request if the first one hasn't answered
+        within given percentile of observed latencies (e.g. 95)'''
+    )
+    group.add_option(
+        '--breaker', type='float', default=None,
+        help='''Open circuit breaker of API endpoint when error rate
+        of recent requests reaches given value (0 - 1)'''
+    )
+    group.add_option(
+        '--breaker-reset', type='float', default=30.0,
+        help='Seconds before open circuit breaker sends trial request (float)'
+    )
+    group.add_option(
+        '--park', action='store_true', default=False,
+        help='Wait while circuit breaker is open instead of skipping points'
+    )
+    parser.add_option_group(group)
+
+    return parser
+
+
+def add_batch_options(parser):
+    """Adds fetch workers, writer and parameter sweep options to parser.
+
+    :param parser (optparse.OptionParser)
+
+    Returns:
+        parser (optparse.OptionParser)
+    """
+
+    group = OptionGroup(parser, 'Batch options')
+    group.add_option(
+        '--workers', type='int', default=4,
+        help='Number of concurrent requests (int)'
+    )
+    group.add_option(
+        '--queue-size', type='int', default=1000,
+        help='Maximum number of catchments waiting to be saved (int)'
+    )
+    group.add_option(
+        '--writers', type='int', default=4,
+        help='Number of files saved at once (int)'
+    )
+    group.add_option(
+        '-g', '--grid', type='string', action='append', default=None,
+        help='''Sweep param values (key=value1,value2), can be repeated,
+        every combination is requested and saved in its own directory'''
+    )
+    parser.add_option_group(group)
+
+    return parser
+
+
+def add_profile_options(parser):
+    """Adds profiling options to parser.
+
+    :param parser (optparse.OptionParser)
+
+    Returns:
+        parser (optparse.OptionParser)
+    """
+
+    group = OptionGroup(parser, 'Profiling options')
+    group.add_option(
+        '--profile', type='string', default=None,
+        help='''Profile the run and save results with given path prefix
+        (*.trace.json, *.folded, *.pstats files)'''
+    )
+    group.add_option(
+        '--profile-rate', type='float', default=1.0,
+        help='Fraction of points stages timings are recorded for (0 - 1)'
+    )
+    group.add_option(
+        '--profile-spans-only', action='store_true', default=False,
+        help='Record stages timings only, without cProfile (low overhead)'
+    )
+    parser.add_option_group(group)
+
+    return parser
 
 
 def create_skobbler_parser():
@@ -55,6 +160,10 @@ def create_skobbler_parser():
         inside the RealReach™ (0, 1)'''
     )
 
+    add_transport_options(parser)
+    add_batch_options(parser)
+    add_profile_options(parser)
+
     return parser
 
 
@@ -96,4 +205,63 @@ def create_here_parser():
         (fastest;car;traffic:disabled)'''
     )
 
+    add_transport_options(parser)
+    add_batch_options(parser)
+    add_profile_options(parser)
+
+    return parser
+
+
+def create_server_parser():
+    """Creates parser for catchments server commandline arguments.
+
+    Returns:
+        parser (optparse.OptionParser)
+    """
+
+    parser = OptionParser()
+
+    # Credentials, at least one provider is required
+    parser.add_option(
+        '--here-app-id', type='string',
+        help='HERE API app_id'
+    )
+    parser.add_option(
+        '--here-app-code', type='string',
+        help='HERE API app_code'
+    )
+    parser.add_option(
+        '--skobbler-key', type='string',
+        help='SKOBBLER API key'
+    )
+
+    # Optional parameters
+    parser.add_option(
+        '--host', type='string', default='127.0.0.1',
+        help='Address to listen on'
+    )
+    parser.add_option(
+        '--port', type='int', default=8000,
+        help='Port to listen on (int)'
+    )
+    parser.add_option(
+        '--workers', type='int', default=8,
+        help='Number of concurrent requests to API providers (int)'
+    )
+    parser.add_option(
+        '--rate', type='float', default=None,
+        help='Maximum number of requests per second to API providers (float)'
+    )
+    parser.add_option(
+        '--cache-size', type='int', default=10000,
+        help='Maximum number of cached catchments (int)'
+    )
+    parser.add_option(
+        '--cache-ttl', type='float', default=3600.0,
+        help='Seconds catchments are cached for (float)'
+    )
+
+    add_transport_options(parser)
+    add_profile_options(parser)
+
     return parser
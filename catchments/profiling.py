@@ -0,0 +1,319 @@
+import os
+import sys
+import threading
+import time
+
+
+# Profiler collecting spans, None if profiling is off
+_active = None
+
+
+class _NoSpan(object):
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+def point_key(point):
+    """Returns identifier of point used in span args and sampling."""
+
+    return point.get('name', '{}_{}'.format(point['lat'], point['lon']))
+
+
+def span(name, point=None):
+    """Measures wall-clock time of a stage (e.g. 'request', 'write').
+
+    Does nothing (and costs almost nothing) if no Profiler is active.
+
+    :param name (string): stage name
+
+    :param point (dictionary or Point): processed point
+
+    Returns:
+        context manager
+    """
+
+    profiler = _active
+    if profiler is None:
+        return _NO_SPAN
+
+    return profiler.span(name, point)
+
+
+def iter_spans(iterable, name):
+    """Yields items of iterable, measuring time of getting every item."""
+
+    iterator = iter(iterable)
+    while True:
+        with span(name):
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+        yield item
+
+
+class _Span(object):
+
+    __slots__ = ('profiler', 'name', 'point', 'start')
+
+    def __init__(self, profiler, name, point):
+        self.profiler = profiler
+        self.name = name
+        self.point = point
+
+    def __enter__(self):
+        self.profiler._stack().append(self.name)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        end = time.perf_counter()
+        stack = self.profiler._stack()
+        self.profiler._record(self, end, tuple(stack))
+        stack.pop()
+        return False
+
+
+class Profiler(object):
+    """Captures cProfile data and per-stage spans of a batch run.
+
+    Use it as a context manager, files are written on exit:
+        <output>.trace.json - spans in Chrome Trace Event Format
+            (chrome://tracing, Perfetto, speedscope), appended every
+            flush_size spans, so memory use is bounded in long runs
+        <output>.folded - spans as folded stacks with microseconds
+            (flamegraph.pl, speedscope), aggregated on flush
+        <output>.pstats - cProfile data of all threads
+            (pstats, snakeviz, flameprof), if cprofile is True
+
+    :param output (path): output files path prefix
+
+    :param sample_rate (float): fraction (0 - 1) of points spans are recorded for,
+        points are sampled consistently across stages
+
+    :param cprofile (bool): capture cProfile data (adds overhead to every
+        Python call, spans only are cheap enough for production runs)
+
+    :param flush_size (int): maximum number of spans kept in memory
+    """
+
+    def __init__(self, output, sample_rate=1.0, cprofile=True, flush_size=10000):
+        self.output = output
+        self.sample_rate = sample_rate
+        self.cprofile = cprofile
+        self.flush_size = flush_size
+        # Spans recorded since last flush
+        self.spans = []
+        self.paths = []
+        self._profiles = []
+        self._folded = {}
+        self._threads = {}
+        self._trace = None
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._started = None
+
+    def _stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def sampled(self, point):
+        """Returns True if spans of point should be recorded."""
+
+        if self.sample_rate >= 1:
+            return True
+
+        import random
+        import zlib
+
+        if point is None:
+            return random.random() < self.sample_rate
+
+        key = str(point_key(point)).encode('utf-8')
+
+        return zlib.crc32(key) % 10000 < self.sample_rate * 10000
+
+    def span(self, name, point=None):
+        if not self.sampled(point):
+            return _NO_SPAN
+        return _Span(self, name, point)
+
+    def _record(self, span, end, stack):
+        thread = threading.current_thread()
+        record = (
+            span.name, span.start, end, thread.ident, thread.name, stack,
+            None if span.point is None else point_key(span.point)
+        )
+        with self._lock:
+            self.spans.append(record)
+            if len(self.spans) >= self.flush_size:
+                self._flush()
+
+    def _flush(self):
+        # Called with lock held
+        import json
+        import re
+
+        pid = os.getpid()
+        for name, start, end, tid, thread_name, stack, point in self.spans:
+            self._threads[tid] = thread_name
+            event = {
+                'name': name, 'cat': 'catchments', 'ph': 'X',
+                'ts': (start - self._started) * 1e6,
+                'dur': (end - start) * 1e6,
+                'pid': pid, 'tid': tid,
+            }
+            if point is not None:
+                event['args'] = {'point': point}
+            self._trace.write(json.dumps(event) + ',\n')
+
+            # Threads of a pool ('prefix_N', 'Thread-N (...)') share one root
+            key = (re.sub(r'[-_]\d+', '', thread_name), stack)
+            self._folded[key] = self._folded.get(key, 0.0) + (end - start) * 1e6
+
+        self._trace.flush()
+        self.spans = []
+
+    def _profile_thread(self, *args):
+        import cProfile
+
+        # Called once in every new thread, replaced by the thread's profiler
+        sys.setprofile(None)
+        profile = cProfile.Profile()
+        with self._lock:
+            self._profiles.append(profile)
+        profile.enable()
+
+    def start(self):
+        global _active
+
+        if self.cprofile:
+            import cProfile
+
+            profile = cProfile.Profile()
+            self._profiles.append(profile)
+            # Since Python 3.12 cProfile profiles all threads
+            if sys.version_info < (3, 12):
+                threading.setprofile(self._profile_thread)
+            profile.enable()
+
+        directory = os.path.dirname(self.output)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # JSON array format, readable even if the process is killed
+        # before the closing bracket is written
+        self._trace = open(self.output + '.trace.json', 'w')
+        self._trace.write('[\n')
+
+        self._started = time.perf_counter()
+        _active = self
+
+        return self
+
+    def stop(self):
+        """Stops profiling and writes output files.
+
+        Returns:
+            paths (list): written files paths
+        """
+
+        global _active
+
+        _active = None
+
+        if self.cprofile:
+            if sys.version_info < (3, 12):
+                threading.setprofile(None)
+            for profile in self._profiles:
+                profile.disable()
+
+        with self._lock:
+            self._flush()
+
+        self.paths = [self.write_trace(), self.write_folded()]
+        if self.cprofile:
+            self.paths.append(self.write_pstats())
+
+        return self.paths
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def write_trace(self):
+        """Finishes Chrome Trace Event Format file with thread names."""
+
+        import json
+
+        pid = os.getpid()
+        events = [
+            {
+                'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid,
+                'args': {'name': thread_name},
+            }
+            for tid, thread_name in self._threads.items()
+        ]
+        self._trace.write(',\n'.join(json.dumps(event) for event in events))
+        self._trace.write('\n]\n')
+        self._trace.close()
+
+        return self._trace.name
+
+    def write_folded(self):
+        """Writes spans as folded stacks (self time in microseconds).
+
+        Threads of a pool are merged into one root.
+        """
+
+        totals = dict(
+            (';'.join((thread_name,) + stack), duration)
+            for (thread_name, stack), duration in self._folded.items()
+        )
+
+        # Time of nested spans is subtracted from their parents
+        for key, duration in list(totals.items()):
+            parent = key.rpartition(';')[0]
+            if parent in totals:
+                totals[parent] -= duration
+
+        path = self.output + '.folded'
+        with open(path, 'w') as f:
+            for key in sorted(totals):
+                f.write('{} {}\n'.format(key, max(int(totals[key]), 0)))
+
+        return path
+
+    def write_pstats(self):
+        """Writes merged cProfile data of all threads."""
+
+        import pstats
+
+        stats = pstats.Stats(*self._profiles)
+
+        path = self.output + '.pstats'
+        stats.dump_stats(path)
+
+        return path
+
+
+def profile(output, sample_rate=1.0, cprofile=True):
+    """Profiles code run in with block, see Profiler.
+
+    Example:
+        with profile('profiles/run', sample_rate=0.1, cprofile=False):
+            run_batch(api, points, params)
+    """
+
+    return Profiler(output, sample_rate=sample_rate, cprofile=cprofile)
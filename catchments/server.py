@@ -0,0 +1,364 @@
+import json
+import threading
+import time
+from collections import Counter, OrderedDict
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from urllib.parse import urlsplit, parse_qsl
+from catchments.models import Point
+
+
+class TTLCache(object):
+    """Thread-safe LRU cache with entries expiring after ttl seconds.
+
+    :param size (int): maximum number of entries
+
+    :param ttl (float): seconds entries are valid for
+    """
+
+    def __init__(self, size=10000, ttl=3600.0, clock=time.monotonic):
+        self.size = size
+        self.ttl = ttl
+        self.clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Returns cached value, None if missing or expired."""
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= self.clock():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (self.clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class _Call(object):
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class Coalescer(object):
+    """Runs only one call per key at a time, concurrent callers with the
+    same key wait for it and share its result."""
+
+    def __init__(self):
+        self.coalesced = 0
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def run(self, key, function):
+        """Returns function() result, shared with concurrent calls with the same key."""
+
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = function()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+
+        return call.result
+
+
+class CatchmentService(object):
+    """Serves catchments from API providers to many callers, with shared
+    cache and coalescing of identical concurrent requests.
+
+    APIs should share one Transport, so callers share its connection
+    pool (session), rate limiter and circuit breakers.
+
+    :param apis (dictionary): API objects by provider name, e.g. {'here': HereAPI(...)}
+
+    :param cache (TTLCache): cache of Catchment objects, None disables caching
+
+    :param workers (int): number of concurrent requests of batch calls
+    """
+
+    def __init__(self, apis, cache=None, workers=8):
+        from concurrent.futures import ThreadPoolExecutor
+
+        self.apis = dict(apis)
+        self.cache = cache
+        self.coalescer = Coalescer()
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix='catchments-server'
+        )
+        self.stats = Counter()
+        self._lock = threading.Lock()
+
+    def _count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    def _key(self, provider, point, params):
+        params = tuple(sorted((key, str(value)) for key, value in params.items()))
+
+        return (provider, point.lat, point.lon, params)
+
+    def _fetch(self, api, key, point, params):
+        self._count('requests')
+        try:
+            catchment = api.get_catchment(point, **params)
+            if catchment is None:
+                return None
+            catchment = api.catchment_as_compact(catchment)
+        except ValueError:
+            # Undecodable or malformed API response
+            self._count('invalid')
+            return None
+
+        if catchment is not None and self.cache is not None:
+            self.cache.set(key, catchment)
+
+        return catchment
+
+    def get_feature(self, provider, point, params=None):
+        """Returns catchment of point as GeoJSON feature.
+
+        :param provider (string): provider name
+
+        :param point (Point)
+
+        :param params (dictionary): API params
+
+        Returns:
+            GeoJSON polygon feature if successful, None otherwise.
+
+        Raises:
+            KeyError if provider is unknown,
+            exception raised by API provider (counted in 'errors' stats)
+        """
+
+        api = self.apis[provider]
+        params = params or {}
+        key = self._key(provider, point, params)
+
+        catchment = self.cache.get(key) if self.cache is not None else None
+        if catchment is not None:
+            self._count('cache_hits')
+        else:
+            try:
+                catchment = self.coalescer.run(
+                    key, lambda: self._fetch(api, key, point, params)
+                )
+            except Exception:
+                self._count('errors')
+                raise
+
+        if catchment is None:
+            return None
+
+        geojson = catchment.geojson
+        geojson['properties']['name'] = point.get(
+            'name', '{}_{}'.format(point['lat'], point['lon'])
+        )
+
+        return geojson
+
+    def get_features(self, provider, points, params=None):
+        """Requests catchments of points concurrently.
+
+        Returns:
+            generator of (point, GeoJSON feature or None, exception or None)
+            tuples, in order of completion
+        """
+
+        from concurrent.futures import as_completed
+
+        futures = dict(
+            (self.executor.submit(self.get_feature, provider, point, params), point)
+            for point in points
+        )
+        for future in as_completed(futures):
+            try:
+                feature, error = future.result(), None
+            except Exception as e:
+                feature, error = None, e
+            yield futures[future], feature, error
+
+    def summary(self):
+        """Returns service statistics (dictionary)."""
+
+        with self._lock:
+            summary = dict(self.stats)
+
+        summary['coalesced'] = self.coalescer.coalesced
+        if self.cache is not None:
+            summary['cached'] = len(self.cache)
+
+        transports = set(
+            api.transport for api in self.apis.values()
+            if getattr(api, 'transport', None) is not None
+        )
+        if len(transports) == 1:
+            summary['transport'] = transports.pop().summary()
+
+        return summary
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+
+
+class CatchmentRequestHandler(BaseHTTPRequestHandler):
+    """HTTP API of CatchmentService:
+
+    GET /catchment?provider=here&lat=52.40&lon=16.93[&name=...][&API params]
+        GeoJSON feature (502 if catchment couldn't be acquired,
+        500 if processing failed)
+
+    POST /batch?provider=here[&API params]
+        body: {"points": [{"lat": 52.40, "lon": 16.93, "name": "..."}, ...],
+               "params": {...}}
+        NDJSON stream, one {"point": {...}, "feature": {...} or null}
+        line per point (with "error" if processing failed),
+        in order of completion
+
+    GET /stats
+        service statistics
+    """
+
+    server_version = 'catchments'
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            BaseHTTPRequestHandler.log_message(self, format, *args)
+
+    def _send_json(self, status, body):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _provider(self, query):
+        provider = query.pop('provider', None)
+        if provider not in self.server.service.apis:
+            self._send_json(404, {'error': 'Unknown provider: {}'.format(provider)})
+            return None
+        return provider
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        query = dict(parse_qsl(url.query))
+
+        if url.path == '/stats':
+            self._send_json(200, self.server.service.summary())
+            return
+
+        if url.path != '/catchment':
+            self._send_json(404, {'error': 'Not found'})
+            return
+
+        provider = self._provider(query)
+        if provider is None:
+            return
+
+        try:
+            point = Point(query.pop('lat'), query.pop('lon'), query.pop('name', None))
+        except (KeyError, ValueError):
+            self._send_json(400, {'error': 'lat and lon (float) are required'})
+            return
+
+        try:
+            feature = self.server.service.get_feature(provider, point, query)
+        except Exception as e:
+            self._send_json(500, {'error': str(e) or type(e).__name__})
+            return
+
+        if feature is None:
+            self._send_json(502, {'error': 'Couldn\'t get catchment'})
+        else:
+            self._send_json(200, feature)
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        query = dict(parse_qsl(url.query))
+
+        if url.path != '/batch':
+            self._send_json(404, {'error': 'Not found'})
+            return
+
+        provider = self._provider(query)
+        if provider is None:
+            return
+
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            body = json.loads(self.rfile.read(length).decode('utf-8'))
+            points = [Point.from_dict(point) for point in body['points']]
+            query.update(body.get('params', {}))
+        except (KeyError, TypeError, ValueError):
+            self._send_json(400, {'error': 'Body should be {"points": [{"lat": ..., "lon": ...}, ...]}'})
+            return
+
+        # Streamed until all points are processed, connection is closed afterwards
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.close_connection = True
+
+        features = self.server.service.get_features(provider, points, query)
+        for point, feature, error in features:
+            line = {
+                'point': {'name': point.name, 'lat': point.lat, 'lon': point.lon},
+                'feature': feature,
+            }
+            if error is not None:
+                line['error'] = str(error) or type(error).__name__
+            self.wfile.write(json.dumps(line).encode('utf-8') + b'\n')
+            self.wfile.flush()
+
+
+class CatchmentServer(ThreadingMixIn, HTTPServer):
+    """Threaded HTTP server exposing CatchmentService.
+
+    :param address (tuple): (host, port)
+
+    :param service (CatchmentService)
+
+    :param quiet (bool): don't log requests
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address, service, quiet=False):
+        HTTPServer.__init__(self, address, CatchmentRequestHandler)
+        self.service = service
+        self.quiet = quiet
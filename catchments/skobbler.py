@@ -1,23 +1,37 @@
 import os
-import csv
-import json
-import requests
+from catchments.geometry import repair_ring
+from catchments.models import Catchment
+from catchments.profiling import span
+from catchments.transport import Transport, TransportError
+from catchments.utils import atomic_write
 
 
 class SkobblerAPI(object):
     """The SkobblerAPI object implements Skobbler RealReach API."""
 
-    def __init__(self, api_key):
+    provider = 'SKOBBLER'
+
+    # Formatted with API key
+    url = 'http://{0}.tor.skobbler.net/tor/RSngx/RealReach/json/20_5/en/{0}'
+
+    def __init__(self, api_key, transport=None, url=None):
         self.api_key = api_key
+        self.transport = transport or Transport()
+        if url:
+            self.url = url
 
     def _request(self, url, point, params):
+        # Imported here, so importing the package doesn't pay for requests
+        import requests
+
         try:
-            r = requests.get(url, params=params)
-            r.raise_for_status()
-        except requests.HTTPError:
+            with span('request', point):
+                r = self.transport.get(url, params=params, endpoint=self.provider)
+        except (requests.RequestException, TransportError):
             return None
 
-        catchment = r.json()
+        with span('decode', point):
+            catchment = r.json()
 
         catchment['name'] = point.get(
             'name', '{}_{}'.format(point['lat'], point['lon'])
@@ -28,7 +42,7 @@ class SkobblerAPI(object):
     def get_catchment(self, point, **params):
         """Requests catchment from API provider.
 
-        :param point (dictionary):
+        :param point (dictionary or Point):
             {'name': 'place', 'lon': 50.0, 'lat': 20.0}
             'name' key is optional, 'lon' and 'lat' are required.
 
@@ -42,9 +56,7 @@ class SkobblerAPI(object):
             API response if successful, None otherwise.
         """
 
-        url = 'http://{}.tor.skobbler.net/tor/RSngx/RealReach/json/20_5/en/{}'.format(
-            self.api_key, self.api_key
-        )
+        url = self.url.format(self.api_key)
 
         request_params = {}
 
@@ -67,47 +79,65 @@ class SkobblerAPI(object):
         return self._request(url, point, request_params)
 
     @staticmethod
-    def catchment_as_geojson(catchment):
-        """Processing catchment to GeoJSON format.
+    def catchment_as_compact(catchment):
+        """Processing catchment to compact Catchment object.
 
         :param catchment (dictionary)
 
         Returns:
-            GeoJSON polygon feature if successful, None otherwise.
+            Catchment if successful, None otherwise.
         """
 
-        geojson = {
-            "type": "Feature",
-            "geometry": {
-                "type": "Polygon", "coordinates": [[]]
-            },
-            "properties": {}
-        }
-
         try:
             coords = catchment['realReach']['gpsPoints']
             bbox = catchment['realReach']['gpsBBox']
         except KeyError:
             return None
 
+        ring = []
+        dropped = 0
         for i, coord in enumerate(coords):
             if (i % 2 == 0):
                 if not (coord < bbox[0] or coord > bbox[2]):
-                    geojson['geometry']['coordinates'][0].append(
-                        [coord, coords[i + 1]]
-                    )
+                    ring.append(coord)
+                    ring.append(coords[i + 1])
+                elif abs(coord) != 180:
+                    # Vertices of the world frame (longitude -180/180)
+                    # aren't part of the catchment, other ones are lost
+                    dropped += 1
+
+        # SKOBBLER doesn't repeat the first vertex
+        ring, fixes = repair_ring(ring, closed=False)
+        if 'degenerate_ring' in fixes:
+            return None
+        if dropped:
+            fixes['dropped_vertices'] = dropped
 
-        # Close GeoJSON polygon
-        geojson['geometry']['coordinates'][0].append(
-            geojson['geometry']['coordinates'][0][0]
+        return Catchment(
+            catchment['name'], ring, provider=SkobblerAPI.provider, fixes=fixes
         )
-        geojson['properties']['name'] = catchment['name']
 
-        return geojson
+    @staticmethod
+    def catchment_as_geojson(catchment):
+        """Processing catchment to GeoJSON format.
+
+        :param catchment (dictionary or Catchment)
+
+        Returns:
+            GeoJSON polygon feature if successful, None otherwise.
+        """
+
+        if not isinstance(catchment, Catchment):
+            catchment = SkobblerAPI.catchment_as_compact(catchment)
+
+        if catchment is None:
+            return None
+
+        return catchment.geojson
 
     @staticmethod
     def save_as_geojson(geojson, save_in=None):
-        """Save GeoJSON feature to *.geojson file.
+        """Save GeoJSON feature to *.geojson file (atomically).
 
         :param geojson (dictionary - GeoJSON feature)
 
@@ -118,16 +148,15 @@ class SkobblerAPI(object):
            path_to_save: saved *.geojson file path
         """
 
-        name = 'SKOBBLER_{}.geojson'.format(geojson['properties']['name'])
+        name = '{}_{}.geojson'.format(SkobblerAPI.provider, geojson['properties']['name'])
 
         if save_in:
             path_to_save = os.path.join(save_in, name)
         else:
             path_to_save = os.path.join(os.getcwd(), name)
 
-        feature = json.dumps(geojson, indent=2)
+        import json
 
-        with open(path_to_save, 'w') as f:
-            f.write(feature)
+        feature = json.dumps(geojson, indent=2)
 
-        return path_to_save
+        return atomic_write(path_to_save, feature)
@@ -0,0 +1,123 @@
+import os
+import re
+from collections import OrderedDict
+from itertools import product
+from catchments.batch import Pipeline
+from catchments.models import Point
+from catchments.profiling import iter_spans
+
+
+def parse_grid(specs):
+    """Creates parameter grid from 'key=value1,value2' strings.
+
+    :param specs (list): e.g. ['range=300,600', 'transport=car,bike']
+
+    Returns:
+        grid (OrderedDict): {'range': ['300', '600'], 'transport': ['car', 'bike']}
+
+    Raises:
+        ValueError if spec is malformed
+    """
+
+    grid = OrderedDict()
+    for spec in specs:
+        key, separator, values = spec.partition('=')
+        if not (key and separator and values):
+            raise ValueError('Invalid grid param: {}'.format(spec))
+        grid[key] = values.split(',')
+
+    return grid
+
+
+def expand_grid(grid):
+    """Creates every combination of grid params.
+
+    :param grid (dictionary): params values by name
+
+    Returns:
+        list of params dictionaries
+    """
+
+    keys = list(grid)
+
+    return [dict(zip(keys, values)) for values in product(*(grid[key] for key in keys))]
+
+
+def param_set_name(params):
+    """Returns name of params set, safe to use as directory name.
+
+    :param params (dictionary)
+
+    Returns:
+        name (string), e.g. 'range-600_transport-car'
+    """
+
+    return '_'.join(
+        '{}-{}'.format(key, re.sub(r'[^\w.]+', '-', str(params[key])).strip('-'))
+        for key in sorted(params)
+    )
+
+
+def run_sweep(api, points, grid, params=None, save_in=None, **options):
+    """Gets catchments for every point and params combination.
+
+    Points are read once and all combinations are scheduled through one
+    pipeline (connections, workers and writer are shared), interleaved
+    point by point, so fetch workers are kept busy across params sets.
+    GeoJSON files of every params set are saved in its own directory.
+    Points are kept in memory as compact Point objects, rows with missing
+    or malformed coordinates are reported as 'invalid' in every params set.
+
+    :param api (API object): HereAPI, SkobblerAPI or CompositeAPI
+
+    :param points (iterable): point dictionaries or Point objects
+
+    :param grid (dictionary): swept params values by name, e.g. {'range': [300, 600]}
+
+    :param params (dictionary): API params shared by all combinations
+
+    :param save_in (path): directory for params sets directories (current by default)
+
+    :param options (**dictionary): Pipeline options (workers, queue_size, writers, report)
+
+    Returns:
+        results (OrderedDict): params set name: {
+            'params': params (dictionary),
+            'save_in': directory path,
+            'stats': number of points per status (Counter)
+        }
+    """
+
+    rows, points, invalid = points, [], []
+    for row in iter_spans(rows, 'read_csv'):
+        try:
+            points.append(
+                row if isinstance(row, Point) else Point.from_dict(row, default_name=True)
+            )
+        except (KeyError, TypeError, ValueError) as e:
+            invalid.append((row, e))
+    base = save_in or os.getcwd()
+
+    results = OrderedDict()
+    for swept in expand_grid(grid):
+        set_params = dict(params or {}, **swept)
+        name = param_set_name(swept)
+        directory = os.path.join(base, name)
+        os.makedirs(directory, exist_ok=True)
+        results[name] = {'params': set_params, 'save_in': directory}
+
+    with Pipeline(api, **options) as pipeline:
+        for row, error in invalid:
+            for name in results:
+                pipeline.report('invalid', row, error, group=name)
+        for point in points:
+            if pipeline.expired:
+                pipeline.report('deadline_exceeded', point)
+                break
+            for name, result in results.items():
+                pipeline.submit(point, result['params'], result['save_in'], group=name)
+
+    for name, result in results.items():
+        result['stats'] = pipeline.groups[name]
+
+    return results
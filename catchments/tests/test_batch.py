@@ -0,0 +1,141 @@
+from unittest import TestCase
+from unittest.mock import Mock
+from tempfile import mkdtemp
+from shutil import rmtree
+import os
+import threading
+import time
+from catchments import HereAPI, Catchment
+from catchments.batch import Pipeline, run_batch
+from catchments.transport import Deadline
+from .test_data import EXAMPLE_HERE_CATCHMENT
+
+
+# Run tests with:
+# coverage run --branch --source=catchments/ setup.py test
+# To check coverage report (with missing lines)
+# coverage report -m
+
+
+class TestRunBatch(TestCase):
+
+    def setUp(self):
+        self.test_dir = mkdtemp()
+        self.here_api = HereAPI('app_id', 'app_code')
+        self.here_api.get_catchment = Mock(
+            side_effect=lambda point, **params: dict(EXAMPLE_HERE_CATCHMENT, name=point['name'])
+        )
+        self.points = [{'name': 'p{}'.format(i), 'lat': 50.0, 'lon': 16.0} for i in range(10)]
+        self.reports = []
+
+    def tearDown(self):
+        rmtree(self.test_dir)
+
+    def report(self, status, point, detail=None):
+        self.reports.append((status, point['name']))
+
+    def test_run_batch(self):
+        stats = run_batch(
+            self.here_api, self.points, {'range': 600},
+            workers=3, save_in=self.test_dir, queue_size=2, writers=2,
+            report=self.report
+        )
+
+        self.assertEqual(stats, {'created': 10})
+        self.assertEqual(len(self.reports), 10)
+        self.assertEqual(
+            sorted(os.listdir(self.test_dir)),
+            sorted('HERE_p{}.geojson'.format(i) for i in range(10))
+        )
+        self.assertEqual(self.here_api.get_catchment.call_args[1], {'range': 600})
+
+    def test_failed_points(self):
+        self.here_api.get_catchment = Mock(side_effect=[None, {'response': {}, 'name': 'x'}])
+
+        stats = run_batch(self.here_api, self.points[:2], workers=1, save_in=self.test_dir)
+
+        self.assertEqual(stats, {'http_error': 1, 'invalid': 1})
+
+    def test_write_error(self):
+        missing_dir = os.path.join(self.test_dir, 'missing')
+
+        stats = run_batch(self.here_api, self.points[:1], save_in=missing_dir)
+
+        self.assertEqual(stats, {'write_error': 1})
+
+    def test_slow_writes_dont_throttle_fetches(self):
+        save_as_geojson = self.here_api.save_as_geojson
+
+        def slow_save(geojson, save_in=None):
+            time.sleep(0.1)
+            return save_as_geojson(geojson, save_in=save_in)
+
+        self.here_api.save_as_geojson = slow_save
+        points = [{'name': 'p{}'.format(i), 'lat': 50.0, 'lon': 16.0} for i in range(16)]
+
+        started = time.monotonic()
+        stats = run_batch(
+            self.here_api, points, save_in=self.test_dir, queue_size=1, writers=8
+        )
+
+        # One writer thread would need 1.6 s
+        self.assertLess(time.monotonic() - started, 0.8)
+        self.assertEqual(stats, {'created': 16})
+
+    def test_geojson_is_built_by_writer(self):
+        catchment_as_geojson = self.here_api.catchment_as_geojson
+        threads = []
+
+        def as_geojson(catchment):
+            threads.append(threading.current_thread().name)
+            self.assertIsInstance(catchment, Catchment)
+            return catchment_as_geojson(catchment)
+
+        self.here_api.catchment_as_geojson = as_geojson
+
+        stats = run_batch(self.here_api, self.points[:3], save_in=self.test_dir)
+
+        self.assertEqual(stats, {'created': 3})
+        self.assertTrue(all(name.startswith('catchments-writer') for name in threads))
+
+    def test_deadline_stops_scheduling(self):
+        self.here_api.transport.deadline = Deadline(0)
+
+        stats = run_batch(self.here_api, self.points, save_in=self.test_dir, report=self.report)
+
+        self.assertEqual(stats, {'deadline_exceeded': 1})
+        self.assertFalse(self.here_api.get_catchment.called)
+
+    def test_submit_with_save_in(self):
+        sub_dir = os.path.join(self.test_dir, 'sub')
+        os.mkdir(sub_dir)
+
+        with Pipeline(self.here_api, save_in=self.test_dir) as pipeline:
+            pipeline.submit(self.points[0], save_in=sub_dir)
+
+        self.assertEqual(os.listdir(sub_dir), ['HERE_p0.geojson'])
+
+    def test_unexpected_error_is_reported(self):
+        self.here_api.get_catchment = Mock(side_effect=RuntimeError('boom'))
+
+        with self.assertLogs('catchments.batch', 'ERROR'):
+            stats = run_batch(
+                self.here_api, self.points[:3], save_in=self.test_dir, report=self.report
+            )
+
+        self.assertEqual(stats, {'error': 3})
+        self.assertEqual(sorted(self.reports), [('error', 'p0'), ('error', 'p1'), ('error', 'p2')])
+
+    def test_writer_survives_unexpected_errors(self):
+        self.here_api.save_as_geojson = Mock(side_effect=[RuntimeError('boom')] + [None] * 9)
+
+        def report(status, point, detail=None):
+            raise RuntimeError('report failed')
+
+        with self.assertLogs('catchments', 'ERROR'):
+            stats = run_batch(
+                self.here_api, self.points, save_in=self.test_dir,
+                queue_size=1, writers=1, report=report
+            )
+
+        self.assertEqual(stats, {'write_error': 1, 'created': 9})
@@ -0,0 +1,173 @@
+from unittest import TestCase
+from unittest.mock import Mock
+from tempfile import mkdtemp
+from shutil import rmtree
+import os
+import threading
+import time
+from catchments import CompositeAPI, HereAPI, SkobblerAPI
+from catchments.composite import here_params, skobbler_params
+from .test_data import EXAMPLE_HERE_CATCHMENT, EXAMPLE_HERE_GEOJSON
+
+
+# Run tests with:
+# coverage run --branch --source=catchments/ setup.py test
+# To check coverage report (with missing lines)
+# coverage report -m
+
+
+class TestParamsMapping(TestCase):
+
+    def test_skobbler_to_here(self):
+        self.assertEqual(
+            here_params({'range': 900, 'transport': 'pedestrian', 'units': 'meter'}),
+            {'range': 900, 'transport': 'pedestrian', 'units': 'meter',
+             'mode': 'fastest;pedestrian;traffic:disabled', 'rangetype': 'distance'}
+        )
+
+    def test_here_to_skobbler(self):
+        self.assertEqual(
+            skobbler_params({'range': 900, 'mode': 'fastest;car;traffic:enabled', 'rangetype': 'time'}),
+            {'range': 900, 'mode': 'fastest;car;traffic:enabled', 'rangetype': 'time',
+             'transport': 'car', 'units': 'sec'}
+        )
+
+    def test_native_params_are_kept(self):
+        params = {'mode': 'shortest;car;traffic:disabled', 'transport': 'bike'}
+        self.assertEqual(here_params(params), params)
+
+    def test_unsupported_transport(self):
+        self.assertEqual(here_params({'transport': 'bike'}), None)
+        self.assertEqual(skobbler_params({'mode': 'fastest;truck;traffic:disabled'}), None)
+
+
+class TestCompositeAPI(TestCase):
+
+    def setUp(self):
+        self.here_api = HereAPI('app_id', 'app_code')
+        self.skobbler_api = SkobblerAPI('api_key')
+        self.here_api.get_catchment = Mock(return_value={'name': 'here'})
+        self.skobbler_api.get_catchment = Mock(return_value={'name': 'skobbler'})
+        self.point = {'lat': 50.0, 'lon': 16.0}
+
+    def test_failover(self):
+        self.here_api.get_catchment.return_value = None
+        api = CompositeAPI([self.here_api, self.skobbler_api])
+
+        catchment = api.get_catchment(self.point, range=600, mode='fastest;car;traffic:disabled')
+
+        self.assertEqual(catchment, {'name': 'skobbler', 'provider': 'SKOBBLER'})
+        self.assertEqual(self.skobbler_api.get_catchment.call_args[1]['transport'], 'car')
+        self.assertEqual(api.summary(), {'SKOBBLER': 1, 'failovers': 1})
+
+    def test_failover_on_provider_error(self):
+        self.here_api.get_catchment.side_effect = ValueError('No JSON object could be decoded')
+        api = CompositeAPI([self.here_api, self.skobbler_api])
+
+        self.assertEqual(api.get_catchment(self.point)['provider'], 'SKOBBLER')
+        self.assertEqual(api.summary(), {'SKOBBLER': 1, 'failovers': 1, 'errors': 1})
+
+    def test_failover_skips_unsupported_provider(self):
+        api = CompositeAPI([self.here_api, self.skobbler_api])
+
+        catchment = api.get_catchment(self.point, transport='bike')
+
+        self.assertEqual(catchment['provider'], 'SKOBBLER')
+        self.assertFalse(self.here_api.get_catchment.called)
+
+    def test_race_first_success_wins(self):
+        release = threading.Event()
+
+        def slow(point, **params):
+            release.wait(5)
+            return {'name': 'here'}
+
+        self.here_api.get_catchment.side_effect = slow
+        api = CompositeAPI([self.here_api, self.skobbler_api], mode='race')
+
+        try:
+            self.assertEqual(api.get_catchment(self.point)['provider'], 'SKOBBLER')
+        finally:
+            release.set()
+
+    def test_race_provider_error(self):
+        release = threading.Event()
+
+        def slow(point, **params):
+            release.wait(5)
+            return {'name': 'skobbler'}
+
+        self.here_api.get_catchment.side_effect = ValueError('No JSON object could be decoded')
+        self.skobbler_api.get_catchment.side_effect = slow
+        api = CompositeAPI([self.here_api, self.skobbler_api], mode='race')
+
+        # HERE fails first, SKOBBLER's later success still wins
+        threading.Timer(0.05, release.set).start()
+        self.assertEqual(api.get_catchment(self.point)['provider'], 'SKOBBLER')
+        self.assertEqual(api.summary(), {'SKOBBLER': 1, 'failovers': 1, 'errors': 1})
+
+    def test_race_slow_losers_dont_delay_callers(self):
+        def slow(point, **params):
+            time.sleep(0.5)
+            return {'name': 'here'}
+
+        self.here_api.get_catchment.side_effect = slow
+        api = CompositeAPI([self.here_api, self.skobbler_api], mode='race', max_workers=16)
+        latencies = []
+
+        def call():
+            started = time.monotonic()
+            api.get_catchment(self.point)
+            latencies.append(time.monotonic() - started)
+
+        callers = [threading.Thread(target=call) for _ in range(8)]
+        for caller in callers:
+            caller.start()
+        for caller in callers:
+            caller.join()
+        api.close()
+
+        self.assertEqual(len(latencies), 8)
+        self.assertLess(max(latencies), 0.3)
+        self.assertEqual(api.summary(), {'SKOBBLER': 8})
+        self.assertIsNone(api._executor)
+
+    def test_race_all_failed(self):
+        self.here_api.get_catchment.return_value = None
+        self.skobbler_api.get_catchment.return_value = None
+        api = CompositeAPI([self.here_api, self.skobbler_api], mode='race')
+
+        self.assertEqual(api.get_catchment(self.point), None)
+
+    def test_balance_by_weights(self):
+        api = CompositeAPI([self.here_api, self.skobbler_api], mode='balance', weights=[3, 1])
+
+        providers = [api.get_catchment(self.point)['provider'] for _ in range(8)]
+
+        self.assertEqual(providers.count('HERE'), 6)
+        self.assertEqual(providers.count('SKOBBLER'), 2)
+
+    def test_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            CompositeAPI([self.here_api], mode='random')
+
+
+class TestCompositeGeojson(TestCase):
+
+    def setUp(self):
+        self.api = CompositeAPI([HereAPI('app_id', 'app_code'), SkobblerAPI('api_key')])
+        self.catchment = dict(EXAMPLE_HERE_CATCHMENT, provider='HERE')
+        self.test_dir = mkdtemp()
+
+    def tearDown(self):
+        rmtree(self.test_dir)
+
+    def test_catchment_as_geojson(self):
+        geojson = self.api.catchment_as_geojson(self.catchment)
+        self.assertEqual(geojson['geometry'], EXAMPLE_HERE_GEOJSON['geometry'])
+        self.assertEqual(geojson['properties'], {'name': 'test_point', 'provider': 'HERE'})
+
+    def test_save_as_geojson(self):
+        geojson = self.api.catchment_as_geojson(self.catchment)
+        path_to_save = self.api.save_as_geojson(geojson, save_in=self.test_dir)
+        self.assertEqual(path_to_save, os.path.join(self.test_dir, 'HERE_test_point.geojson'))
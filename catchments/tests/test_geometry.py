@@ -0,0 +1,146 @@
+from unittest import TestCase, skipUnless
+import math
+import random
+from catchments import HereAPI, SkobblerAPI
+from catchments.geometry import repair_ring, find_self_intersection, signed_area
+from catchments.geometry import _import_numpy
+
+
+# Run tests with:
+# coverage run --branch --source=catchments/ setup.py test
+# To check coverage report (with missing lines)
+# coverage report -m
+
+
+SQUARE = [0.0, 0.0, 1.0, 0.0, 1.0, 1.0, 0.0, 1.0, 0.0, 0.0]
+
+# 0,0 -> 1,1 -> 1,0 -> 0,1 crosses itself
+BOWTIE = [0.0, 0.0, 1.0, 1.0, 1.0, 0.0, 0.0, 1.0, 0.0, 0.0]
+
+
+def circle(n, crossing=False):
+    vertices = [
+        (math.cos(2 * math.pi * i / n), math.sin(2 * math.pi * i / n))
+        for i in range(n)
+    ]
+    if crossing:
+        vertices[10], vertices[11] = vertices[11], vertices[10]
+    return vertices
+
+
+class TestRepairRing(TestCase):
+
+    def test_valid_ring(self):
+        self.assertEqual(repair_ring(SQUARE), (SQUARE, {}))
+
+    def test_duplicate_vertices(self):
+        ring = [0.0, 0.0, 1.0, 0.0, 1.0, 0.0, 1.0, 1.0, 0.0, 1.0, 0.0, 1.0, 0.0, 0.0]
+        self.assertEqual(repair_ring(ring), (SQUARE, {'duplicate_vertices': 2}))
+
+    def test_unclosed_ring(self):
+        self.assertEqual(repair_ring(SQUARE[:-2]), (SQUARE, {'unclosed_ring': 1}))
+        self.assertEqual(repair_ring(SQUARE[:-2], closed=False), (SQUARE, {}))
+
+    def test_orientation(self):
+        clockwise = [0.0, 0.0, 0.0, 1.0, 1.0, 1.0, 1.0, 0.0, 0.0, 0.0]
+        self.assertEqual(repair_ring(clockwise), (SQUARE, {'orientation': 1}))
+
+    def test_self_intersection(self):
+        ring, fixes = repair_ring(BOWTIE)
+        self.assertEqual(fixes, {'self_intersections': 1})
+        self.assertEqual(ring, SQUARE)
+
+    def test_empty_ring(self):
+        self.assertEqual(repair_ring([]), ([], {'degenerate_ring': 1}))
+
+    def test_degenerate_ring(self):
+        self.assertEqual(repair_ring([0.0, 0.0, 0.0, 0.0])[1], {'degenerate_ring': 1})
+        self.assertEqual(repair_ring([1.0, 1.0, 2.0, 2.0])[1], {'degenerate_ring': 1, 'unclosed_ring': 1})
+
+    def test_signed_area(self):
+        vertices = [(0.0, 0.0), (1.0, 0.0), (1.0, 1.0), (0.0, 1.0)]
+        self.assertEqual(signed_area(vertices), 1.0)
+        self.assertEqual(signed_area(vertices[::-1]), -1.0)
+
+
+class TestFindSelfIntersection(TestCase):
+
+    def test_simple_ring(self):
+        self.assertEqual(find_self_intersection(circle(100), use_numpy=False), None)
+
+    def test_crossing(self):
+        self.assertEqual(find_self_intersection(circle(100, True), use_numpy=False), (9, 11))
+
+    @skipUnless(_import_numpy(), 'NumPy is not installed')
+    def test_numpy(self):
+        self.assertEqual(find_self_intersection(circle(600), use_numpy=True), None)
+        self.assertEqual(find_self_intersection(circle(600, True), use_numpy=True), (9, 11))
+        ring = [coord for vertex in circle(600, True) for coord in vertex]
+        self.assertEqual(repair_ring(ring, use_numpy=True), repair_ring(ring, use_numpy=False))
+
+    @skipUnless(_import_numpy(), 'NumPy is not installed')
+    def test_numpy_many_crossings(self):
+        rng = random.Random(0)
+        for _ in range(50):
+            vertices = circle(rng.randint(64, 200))
+            for _ in range(5):
+                i = rng.randrange(len(vertices) - 1)
+                vertices[i], vertices[i + 1] = vertices[i + 1], vertices[i]
+            ring = [coord for vertex in vertices for coord in vertex]
+            self.assertEqual(
+                find_self_intersection(vertices, use_numpy=True),
+                find_self_intersection(vertices, use_numpy=False)
+            )
+            self.assertEqual(repair_ring(ring, use_numpy=True), repair_ring(ring, use_numpy=False))
+
+
+class TestCatchmentRepair(TestCase):
+
+    def test_here_ring_is_closed(self):
+        catchment = {
+            "response": {"isoline": [{"component": [{"shape": [
+                "0.0,0.0", "0.0,1.0", "1.0,1.0", "1.0,0.0"
+            ]}]}]},
+            "name": "test_point"
+        }
+        geojson = HereAPI.catchment_as_geojson(catchment)
+        self.assertEqual(geojson['geometry']['coordinates'][0][0], geojson['geometry']['coordinates'][0][-1])
+        self.assertEqual(geojson['properties']['fixes'], {'unclosed_ring': 1})
+
+    def test_degenerate_here_ring_is_invalid(self):
+        catchment = {
+            "response": {"isoline": [{"component": [{"shape": ["1,1", "2,2"]}]}]},
+            "name": "test_point"
+        }
+        self.assertEqual(HereAPI.catchment_as_compact(catchment), None)
+        catchment['response']['isoline'] = []
+        self.assertEqual(HereAPI.catchment_as_compact(catchment), None)
+
+    def test_empty_skobbler_ring_is_invalid(self):
+        catchment = {
+            "realReach": {"gpsBBox": [10.0, 45.0, 16.0, 52.0], "gpsPoints": []},
+            "name": "test_point"
+        }
+        self.assertEqual(SkobblerAPI.catchment_as_geojson(catchment), None)
+
+    def test_skobbler_ring_is_closed(self):
+        catchment = {
+            "realReach": {"gpsBBox": [-1.0, -1.0, 2.0, 2.0], "gpsPoints": [
+                0.0, 0.0, 1.0, 0.0, 1.0, 1.0, 0.0, 1.0
+            ]},
+            "name": "test_point"
+        }
+        geojson = SkobblerAPI.catchment_as_geojson(catchment)
+        self.assertEqual(geojson['geometry']['coordinates'][0], [list(v) for v in zip(SQUARE[::2], SQUARE[1::2])])
+        self.assertNotIn('fixes', geojson['properties'])
+
+    def test_skobbler_dropped_vertices(self):
+        catchment = {
+            "realReach": {"gpsBBox": [-1.0, -1.0, 2.0, 2.0], "gpsPoints": [
+                -180.0, 85.0, 180.0, 85.0, 180.0, -85.0, -180.0, -85.0,
+                0.0, 0.0, 1.0, 0.0, 5.0, 0.5, 1.0, 1.0, 0.0, 1.0
+            ]},
+            "name": "test_point"
+        }
+        geojson = SkobblerAPI.catchment_as_geojson(catchment)
+        self.assertEqual(geojson['properties']['fixes'], {'dropped_vertices': 1})
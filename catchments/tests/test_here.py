@@ -72,6 +72,11 @@ class TestHereCatchmentAsGeojson(TestCase):
     def test_here_catchment_as_geojson(self):
         self.assertEqual(self.here_geojson_feature, self.here_geojson)
     
+    def test_here_catchment_as_compact(self):
+        catchment = self.here_api.catchment_as_compact(EXAMPLE_HERE_CATCHMENT)
+        self.assertEqual(catchment.provider, 'HERE')
+        self.assertEqual(self.here_api.catchment_as_geojson(catchment), self.here_geojson)
+
     def test_here_invalid_api_response(self):
         invalid_here_response = {"response": {"type": "PermissionError"}}
         self.assertEqual(
@@ -0,0 +1,48 @@
+from unittest import TestCase
+import subprocess
+import sys
+import catchments
+
+
+# Run tests with:
+# coverage run --branch --source=catchments/ setup.py test
+# To check coverage report (with missing lines)
+# coverage report -m
+
+
+def loaded_modules(code):
+    """Returns names of modules loaded after running code in a fresh interpreter."""
+
+    output = subprocess.check_output([
+        sys.executable, '-c',
+        code + '\nimport sys\nprint("\\n".join(sys.modules))'
+    ])
+
+    return output.decode().split()
+
+
+class TestLazyImports(TestCase):
+
+    def test_import_package_is_lightweight(self):
+        modules = loaded_modules('import catchments')
+        for heavy in ['requests', 'catchments.here', 'catchments.skobbler', 'numpy', 'orjson']:
+            self.assertNotIn(heavy, modules)
+
+    def test_import_api_class_defers_requests(self):
+        modules = loaded_modules(
+            'from catchments import HereAPI, SkobblerAPI\n'
+            'import catchments.parsers, catchments.utils'
+        )
+        self.assertIn('catchments.here', modules)
+        self.assertNotIn('requests', modules)
+
+    def test_lazy_attributes(self):
+        from catchments.here import HereAPI
+        from catchments.skobbler import SkobblerAPI
+        self.assertIs(catchments.HereAPI, HereAPI)
+        self.assertIs(catchments.SkobblerAPI, SkobblerAPI)
+        self.assertIn('HereAPI', dir(catchments))
+
+    def test_unknown_attribute(self):
+        with self.assertRaises(AttributeError):
+            catchments.UnknownAPI
@@ -0,0 +1,62 @@
+from unittest import TestCase
+from unittest.mock import patch, Mock
+from catchments import HereAPI, Point, Catchment
+from .test_data import EXAMPLE_HERE_GEOJSON
+
+
+# Run tests with:
+# coverage run --branch --source=catchments/ setup.py test
+# To check coverage report (with missing lines)
+# coverage report -m
+
+
+class TestPoint(TestCase):
+
+    def setUp(self):
+        self.point = Point.from_dict({'lat': '50.0', 'lon': '16.0'})
+
+    def test_float_coordinates(self):
+        self.assertEqual(self.point.lat, 50.0)
+        self.assertEqual(self.point.lon, 16.0)
+
+    def test_dictionary_access(self):
+        self.assertEqual(self.point['lat'], 50.0)
+        self.assertEqual(self.point.get('name', 'default'), 'default')
+        self.assertNotIn('name', self.point)
+        self.assertEqual(self.point.keys(), ['lat', 'lon'])
+        with self.assertRaises(KeyError):
+            self.point['name']
+
+    def test_default_name(self):
+        point = Point.from_dict({'lat': '52.40', 'lon': '16.93'}, default_name=True)
+        self.assertEqual(point.name, '52.40_16.93')
+        point = Point.from_dict({'lat': '52.40', 'lon': '16.93', 'name': 'a'}, default_name=True)
+        self.assertEqual(point.name, 'a')
+
+    def test_slots(self):
+        with self.assertRaises(AttributeError):
+            self.point.extra = 1
+
+    @patch('requests.get')
+    def test_get_catchment_with_point(self, mock_request):
+        mock_response = Mock()
+        mock_response.json.return_value = {}
+        mock_request.return_value = mock_response
+
+        catchment = HereAPI('app_id', 'app_code').get_catchment(self.point)
+
+        self.assertEqual(catchment['name'], '50.0_16.0')
+        self.assertEqual(mock_request.call_args[1]['params']['start'], 'geo!50.0,16.0')
+
+
+class TestCatchment(TestCase):
+
+    def setUp(self):
+        self.coordinates = [16.00, 50.00, 16.10, 50.10, 16.20, 50.20, 16.30, 50.30, 16.00, 50.00]
+        self.catchment = Catchment('test_point', self.coordinates, provider='HERE')
+
+    def test_len(self):
+        self.assertEqual(len(self.catchment), 5)
+
+    def test_geojson(self):
+        self.assertEqual(self.catchment.geojson, EXAMPLE_HERE_GEOJSON)
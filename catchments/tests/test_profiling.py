@@ -0,0 +1,111 @@
+from unittest import TestCase
+from unittest.mock import patch, Mock
+from io import StringIO
+from tempfile import mkdtemp
+from shutil import rmtree
+import json
+import os
+import pstats
+from catchments import HereAPI
+from catchments.batch import run_batch
+from catchments.profiling import Profiler, profile, span
+from catchments.utils import load_points
+from .test_data import EXAMPLE_HERE_CATCHMENT
+
+
+# Run tests with:
+# coverage run --branch --source=catchments/ setup.py test
+# To check coverage report (with missing lines)
+# coverage report -m
+
+
+class TestProfiling(TestCase):
+
+    def setUp(self):
+        self.test_dir = mkdtemp()
+        self.output = os.path.join(self.test_dir, 'profiles', 'run')
+        self.points = StringIO('name,lat,lon\np1,50.0,16.0\np2,50.1,16.1\n')
+
+    def tearDown(self):
+        rmtree(self.test_dir)
+
+    @patch('requests.get')
+    def run_batch(self, mock_request, **options):
+        mock_response = Mock()
+        mock_response.json.side_effect = lambda: {'response': EXAMPLE_HERE_CATCHMENT['response']}
+        mock_request.return_value = mock_response
+
+        with profile(self.output, **options) as profiler:
+            stats = run_batch(
+                HereAPI('app_id', 'app_code'), load_points(self.points),
+                workers=2, save_in=self.test_dir
+            )
+
+        self.assertEqual(stats, {'created': 2})
+
+        return profiler
+
+    def test_profile(self):
+        profiler = self.run_batch()
+
+        self.assertEqual(profiler.paths, [
+            self.output + '.trace.json', self.output + '.folded', self.output + '.pstats'
+        ])
+
+        with open(self.output + '.trace.json') as f:
+            events = json.load(f)
+        spans = [event for event in events if event['ph'] == 'X']
+        self.assertEqual(
+            set(event['name'] for event in spans),
+            {'read_csv', 'request', 'decode', 'convert', 'write'}
+        )
+        self.assertEqual(
+            sorted(event['args']['point'] for event in spans if event['name'] == 'write'),
+            ['p1', 'p2']
+        )
+
+        with open(self.output + '.folded') as f:
+            stacks = [line.rsplit(' ', 1)[0] for line in f]
+        self.assertIn('catchments-writer;write', stacks)
+
+        # Worker threads are profiled too
+        functions = set(name for _, _, name in pstats.Stats(self.output + '.pstats').stats)
+        self.assertIn('catchment_as_geojson', functions)
+
+    def test_sampled_spans_only(self):
+        profiler = self.run_batch(sample_rate=0.0, cprofile=False)
+
+        self.assertEqual(len(profiler.paths), 2)
+        with open(self.output + '.trace.json') as f:
+            events = json.load(f)
+        self.assertEqual([event for event in events if 'args' in event and event['ph'] == 'X'], [])
+
+    def test_spans_are_flushed(self):
+        profiler = Profiler(self.output, cprofile=False, flush_size=3)
+        with profiler:
+            for i in range(10):
+                with span('request', {'name': 'p{}'.format(i), 'lat': 50.0, 'lon': 16.0}):
+                    pass
+                self.assertLess(len(profiler.spans), 3)
+
+        with open(self.output + '.trace.json') as f:
+            events = json.load(f)
+        self.assertEqual(len([event for event in events if event['ph'] == 'X']), 10)
+        with open(self.output + '.folded') as f:
+            self.assertEqual([line.rsplit(' ', 1)[0] for line in f], ['MainThread;request'])
+
+    def test_no_spans(self):
+        with profile(self.output, cprofile=False):
+            pass
+        with open(self.output + '.trace.json') as f:
+            self.assertEqual(json.load(f), [])
+
+    def test_sampling_is_consistent(self):
+        profiler = Profiler(self.output, sample_rate=0.5)
+        point = {'name': 'p1', 'lat': 50.0, 'lon': 16.0}
+        self.assertEqual(len(set(profiler.sampled(point) for _ in range(10))), 1)
+
+    def test_span_without_profiler(self):
+        with span('request') as inactive:
+            pass
+        self.assertIs(span('write'), inactive)
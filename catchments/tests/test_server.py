@@ -0,0 +1,196 @@
+from unittest import TestCase
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import urlsplit, parse_qsl
+import json
+import threading
+import time
+import requests
+from catchments import HereAPI
+from catchments.server import CatchmentServer, CatchmentService, Coalescer, TTLCache
+from catchments.transport import Transport
+from .test_data import EXAMPLE_HERE_CATCHMENT, EXAMPLE_HERE_GEOJSON
+
+
+# Run tests with:
+# coverage run --branch --source=catchments/ setup.py test
+# To check coverage report (with missing lines)
+# coverage report -m
+
+
+class MockHereHandler(BaseHTTPRequestHandler):
+    """Local mock of HERE Isolines API."""
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self.server.requests.append(dict(parse_qsl(urlsplit(self.path).query)))
+        time.sleep(self.server.delay)
+        data = json.dumps({"response": EXAMPLE_HERE_CATCHMENT['response']}).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def start_server(server):
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    return 'http://{}:{}'.format(*server.server_address[:2])
+
+
+class TestTTLCache(TestCase):
+
+    def test_expiry_and_size(self):
+        now = [0.0]
+        cache = TTLCache(size=2, ttl=10, clock=lambda: now[0])
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+        # Least recently used entry is evicted
+        self.assertEqual((cache.get('a'), cache.get('b'), cache.get('c')), (1, None, 3))
+        now[0] = 10
+        self.assertEqual(cache.get('a'), None)
+
+
+class TestCoalescer(TestCase):
+
+    def test_concurrent_calls_share_result(self):
+        coalescer = Coalescer()
+        release = threading.Event()
+        calls = []
+
+        def function():
+            calls.append(1)
+            release.wait(5)
+            return 'result'
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(coalescer.run('key', function)))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        while coalescer.coalesced < 4:
+            time.sleep(0.01)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, ['result'] * 5)
+        self.assertEqual(len(calls), 1)
+
+
+class TestCatchmentServer(TestCase):
+
+    def setUp(self):
+        self.provider = HTTPServer(('127.0.0.1', 0), MockHereHandler)
+        self.provider.requests = []
+        self.provider.delay = 0.2
+        provider_url = start_server(self.provider)
+
+        self.transport = Transport(session=requests.Session())
+        self.service = CatchmentService(
+            {'here': HereAPI('app_id', 'app_code', transport=self.transport, url=provider_url)},
+            cache=TTLCache()
+        )
+        self.server = CatchmentServer(('127.0.0.1', 0), self.service, quiet=True)
+        self.url = start_server(self.server)
+
+    def tearDown(self):
+        for server in (self.server, self.provider):
+            server.shutdown()
+            server.server_close()
+        self.service.close()
+        self.transport.close()
+
+    def get(self, **params):
+        return requests.get(self.url + '/catchment', params=dict(provider='here', **params))
+
+    def test_get_catchment(self):
+        r = self.get(lat=50.0, lon=16.0, name='test_point', range=1200)
+
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(r.json(), EXAMPLE_HERE_GEOJSON)
+        self.assertEqual(self.provider.requests[0]['range'], '1200')
+
+    def test_coalescing_and_cache(self):
+        responses = []
+        threads = [
+            threading.Thread(target=lambda: responses.append(self.get(lat=50.0, lon=16.0)))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.get(lat=50.0, lon=16.0, name='cached')
+
+        self.assertEqual([r.status_code for r in responses], [200] * 5)
+        self.assertEqual(len(self.provider.requests), 1)
+
+        summary = requests.get(self.url + '/stats').json()
+        self.assertEqual(summary['requests'], 1)
+        self.assertEqual(summary['coalesced'] + summary.get('cache_hits', 0), 5)
+        self.assertEqual(summary['transport']['sent'], 1)
+
+    def test_batch_ndjson(self):
+        self.provider.delay = 0
+        body = {
+            'points': [{'lat': 50.0, 'lon': 16.0 + i / 10.0, 'name': str(i)} for i in range(4)],
+            'params': {'range': 900}
+        }
+
+        r = requests.post(self.url + '/batch', params={'provider': 'here'}, json=body, stream=True)
+        lines = [json.loads(line) for line in r.iter_lines() if line]
+
+        self.assertEqual(r.headers['Content-Type'], 'application/x-ndjson')
+        self.assertEqual(sorted(line['point']['name'] for line in lines), ['0', '1', '2', '3'])
+        self.assertTrue(all(line['feature']['type'] == 'Feature' for line in lines))
+        self.assertEqual(set(request['range'] for request in self.provider.requests), {'900'})
+
+    def test_batch_point_error(self):
+        api = self.service.apis['here']
+        get_catchment = api.get_catchment
+
+        def failing(point, **params):
+            if point.name == '1':
+                raise RuntimeError('boom')
+            return get_catchment(point, **params)
+
+        api.get_catchment = failing
+        self.provider.delay = 0
+        body = {'points': [{'lat': 50.0, 'lon': 16.0 + i / 10.0, 'name': str(i)} for i in range(3)]}
+
+        r = requests.post(self.url + '/batch', params={'provider': 'here'}, json=body, stream=True)
+        lines = [json.loads(line) for line in r.iter_lines() if line]
+        lines = dict((line['point']['name'], line) for line in lines)
+
+        self.assertEqual(sorted(lines), ['0', '1', '2'])
+        self.assertEqual(lines['1']['feature'], None)
+        self.assertEqual(lines['1']['error'], 'boom')
+        self.assertNotIn('error', lines['0'])
+        self.assertEqual(self.service.summary()['errors'], 1)
+
+    def test_get_catchment_error(self):
+        self.service.apis['here'].get_catchment = lambda point, **params: 1 / 0
+
+        r = self.get(lat=50.0, lon=16.0)
+
+        self.assertEqual(r.status_code, 500)
+        self.assertIn('error', r.json())
+        self.assertEqual(requests.get(self.url + '/stats').json()['errors'], 1)
+
+    def test_invalid_requests(self):
+        self.assertEqual(self.get(lat='north', lon=16.0).status_code, 400)
+        self.assertEqual(
+            requests.get(self.url + '/catchment', params={'provider': 'other'}).status_code,
+            404
+        )
+        self.assertEqual(
+            requests.post(self.url + '/batch?provider=here', data='[]').status_code,
+            400
+        )
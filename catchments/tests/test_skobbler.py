@@ -75,6 +75,11 @@ class TestSkobblerCatchmentAsGeojson(TestCase):
             self.skobbler_geojson['properties']['name']
         )
     
+    def test_skobbler_catchment_as_compact(self):
+        catchment = self.skobbler_api.catchment_as_compact(EXAMPLE_SKOBBLER_CATCHMENT)
+        self.assertEqual(catchment.provider, 'SKOBBLER')
+        self.assertEqual(self.skobbler_api.catchment_as_geojson(catchment), self.skobbler_geojson)
+
     def test_skobbler_invalid_api_response(self):
         invalid_skobbler_response = {"status": {"httpCode": 401}}
         self.assertEqual(
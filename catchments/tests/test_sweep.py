@@ -0,0 +1,107 @@
+from unittest import TestCase
+from unittest.mock import Mock
+from tempfile import mkdtemp
+from shutil import rmtree
+import os
+from catchments import HereAPI, Point
+from catchments.sweep import parse_grid, expand_grid, param_set_name, run_sweep
+from .test_data import EXAMPLE_HERE_CATCHMENT
+
+
+# Run tests with:
+# coverage run --branch --source=catchments/ setup.py test
+# To check coverage report (with missing lines)
+# coverage report -m
+
+
+class TestGrid(TestCase):
+
+    def test_parse_grid(self):
+        grid = parse_grid(['range=300,600', 'mode=fastest;car;traffic:enabled,fastest;car;traffic:disabled'])
+        self.assertEqual(list(grid), ['range', 'mode'])
+        self.assertEqual(grid['mode'], ['fastest;car;traffic:enabled', 'fastest;car;traffic:disabled'])
+
+    def test_parse_invalid_grid(self):
+        with self.assertRaises(ValueError):
+            parse_grid(['range'])
+
+    def test_expand_grid(self):
+        self.assertEqual(
+            expand_grid({'range': [300, 600], 'transport': ['car', 'bike']}),
+            [
+                {'range': 300, 'transport': 'car'},
+                {'range': 300, 'transport': 'bike'},
+                {'range': 600, 'transport': 'car'},
+                {'range': 600, 'transport': 'bike'},
+            ]
+        )
+
+    def test_param_set_name(self):
+        self.assertEqual(
+            param_set_name({'range': 600, 'mode': 'fastest;car;traffic:disabled'}),
+            'mode-fastest-car-traffic-disabled_range-600'
+        )
+
+
+class TestRunSweep(TestCase):
+
+    def setUp(self):
+        self.test_dir = mkdtemp()
+        self.here_api = HereAPI('app_id', 'app_code')
+        self.here_api.get_catchment = Mock(
+            side_effect=lambda point, **params: dict(EXAMPLE_HERE_CATCHMENT, name=point['name'])
+        )
+        self.points = iter([{'name': 'p{}'.format(i), 'lat': 50.0, 'lon': 16.0} for i in range(3)])
+
+    def tearDown(self):
+        rmtree(self.test_dir)
+
+    def test_run_sweep(self):
+        results = run_sweep(
+            self.here_api, self.points, {'range': ['300', '600']},
+            params={'rangetype': 'time'}, save_in=self.test_dir, workers=2
+        )
+
+        self.assertEqual(list(results), ['range-300', 'range-600'])
+        self.assertEqual(self.here_api.get_catchment.call_count, 6)
+        for name, result in results.items():
+            self.assertEqual(result['stats'], {'created': 3})
+            self.assertEqual(result['params']['rangetype'], 'time')
+            self.assertEqual(
+                sorted(os.listdir(result['save_in'])),
+                ['HERE_p0.geojson', 'HERE_p1.geojson', 'HERE_p2.geojson']
+            )
+
+    def test_interleaved_point_by_point(self):
+        run_sweep(self.here_api, self.points, {'range': ['300', '600']}, save_in=self.test_dir, workers=1)
+
+        self.assertEqual(
+            [(call[0][0]['name'], call[1]['range']) for call in self.here_api.get_catchment.call_args_list],
+            [('p0', '300'), ('p0', '600'), ('p1', '300'), ('p1', '600'), ('p2', '300'), ('p2', '600')]
+        )
+
+    def test_points_are_stored_as_point_objects(self):
+        points = [{'lat': '50.00', 'lon': '16.00'}]
+
+        run_sweep(self.here_api, points, {'range': ['300', '600']}, save_in=self.test_dir, workers=1)
+
+        for call in self.here_api.get_catchment.call_args_list:
+            self.assertIsInstance(call[0][0], Point)
+            self.assertEqual(call[0][0]['name'], '50.00_16.00')
+
+    def test_malformed_rows_are_reported(self):
+        points = [
+            {'name': 'p0', 'lat': '50.0', 'lon': '16.0'},
+            {'name': 'bad_lon', 'lat': '50.0', 'lon': ''},
+            {'name': 'bad_lat', 'lat': 'north', 'lon': '16.0'},
+        ]
+        reports = []
+
+        results = run_sweep(
+            self.here_api, points, {'range': ['300', '600']}, save_in=self.test_dir,
+            report=lambda status, point, detail=None: reports.append((status, point['name']))
+        )
+
+        for result in results.values():
+            self.assertEqual(result['stats'], {'created': 1, 'invalid': 2})
+        self.assertEqual(reports.count(('invalid', 'bad_lon')), 2)
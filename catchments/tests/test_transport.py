@@ -0,0 +1,135 @@
+from unittest import TestCase
+from unittest.mock import patch, Mock
+import threading
+import time
+import requests
+from catchments import HereAPI
+from catchments.transport import Transport, Deadline, DeadlineExceeded, percentile
+from .test_data import EXAMPLE_HERE_PARAMS
+
+
+# Run tests with:
+# coverage run --branch --source=catchments/ setup.py test
+# To check coverage report (with missing lines)
+# coverage report -m
+
+
+class TestPercentile(TestCase):
+
+    def test_percentile(self):
+        samples = list(range(1, 101))
+        self.assertEqual(percentile(samples, 50), 50)
+        self.assertEqual(percentile(samples, 95), 95)
+        self.assertEqual(percentile(samples, 100), 100)
+        self.assertEqual(percentile([3.0], 99), 3.0)
+
+
+class TestTimeouts(TestCase):
+
+    def setUp(self):
+        self.mock_response = Mock()
+
+    @patch('requests.get')
+    def test_timeout_passed_to_request(self, mock_request):
+        mock_request.return_value = self.mock_response
+        Transport(timeout=(1, 5)).get('http://example.com', {})
+        self.assertEqual(mock_request.call_args[1]['timeout'], (1, 5))
+
+    @patch('requests.get')
+    def test_timeout_clamped_to_deadline(self, mock_request):
+        mock_request.return_value = self.mock_response
+        Transport(timeout=(1, 5), deadline=Deadline(2)).get('http://example.com', {})
+        connect, read = mock_request.call_args[1]['timeout']
+        self.assertEqual(connect, 1)
+        self.assertTrue(read <= 2)
+
+    @patch('requests.get')
+    def test_deadline_exceeded(self, mock_request):
+        transport = Transport(deadline=Deadline(0))
+        with self.assertRaises(DeadlineExceeded):
+            transport.get('http://example.com', {})
+        self.assertFalse(mock_request.called)
+        self.assertEqual(transport.summary()['deadline_exceeded'], 1)
+
+    @patch('requests.get')
+    def test_request_timeout_returns_none(self, mock_request):
+        mock_request.side_effect = requests.exceptions.ReadTimeout()
+        here_api = HereAPI('app_id', 'app_code')
+        self.assertEqual(
+            here_api.get_catchment({'lat': 50.0, 'lon': 16.0}, **EXAMPLE_HERE_PARAMS),
+            None
+        )
+        self.assertEqual(here_api.transport.summary()['timeouts'], 1)
+
+
+class TestHedging(TestCase):
+
+    def setUp(self):
+        self.transport = Transport(hedge_percentile=50, hedge_min_samples=2)
+        self.transport.latencies.extend([0.01, 0.01])
+        self.release = threading.Event()
+        self.slow_response = Mock(name='slow')
+        self.fast_response = Mock(name='fast')
+
+    def tearDown(self):
+        self.release.set()
+        self.transport.close()
+
+    @patch('requests.get')
+    def test_hedged_request_wins(self, mock_request):
+        def get(url, params, timeout):
+            if mock_request.call_count == 1:
+                self.release.wait(5)
+                return self.slow_response
+            return self.fast_response
+
+        mock_request.side_effect = get
+
+        self.assertIs(self.transport.get('http://example.com', {}), self.fast_response)
+
+        summary = self.transport.summary()
+        self.assertEqual(summary['hedged'], 1)
+        self.assertEqual(summary['hedge_wins'], 1)
+        self.assertEqual(summary['hedge_rate'], 1.0)
+
+    @patch('requests.get')
+    def test_no_hedge_for_fast_response(self, mock_request):
+        mock_request.return_value = self.fast_response
+
+        self.assertIs(self.transport.get('http://example.com', {}), self.fast_response)
+        self.assertNotIn('hedged', self.transport.summary())
+
+    def test_queued_requests_are_not_hedged(self):
+        # More callers than executor threads, requests wait in the queue
+        # longer than hedge delay, but each one is answered in time
+        session = Mock()
+        session.get.side_effect = lambda url, params, timeout: time.sleep(0.02) or self.fast_response
+        transport = Transport(
+            hedge_percentile=99, hedge_min_samples=2, session=session, max_workers=4
+        )
+        transport.latencies.extend([0.08] * 20)
+
+        callers = [
+            threading.Thread(target=transport.get, args=('http://example.com', {}))
+            for _ in range(32)
+        ]
+        for caller in callers:
+            caller.start()
+        for caller in callers:
+            caller.join()
+        transport.close()
+
+        summary = transport.summary()
+        self.assertEqual(summary['requests'], 32)
+        self.assertLess(summary['hedge_rate'], 0.25)
+        self.assertLess(summary['sent'], 40)
+
+    def test_create_transport_sizes_executor_from_workers(self):
+        from catchments.utils import create_transport
+
+        transport = create_transport({'workers': 16, 'hedge': 95})
+        self.assertEqual(transport.max_workers, 32)
+        transport.close()
+
+    def test_hedging_disabled_without_samples(self):
+        self.assertEqual(Transport(hedge_percentile=95).hedge_delay(), None)
@@ -2,7 +2,9 @@ from unittest import TestCase
 from io import StringIO
 from tempfile import mkdtemp
 from shutil import rmtree
-from catchments.utils import load_input_data
+from catchments.utils import load_input_data, load_points, atomic_write
+from catchments.models import Point
+import os
 import csv
 # csv.OrderedDict is supported only in Python > 3.6
 # collections.OrderedDict for backward compatibility (Python < 3.6)
@@ -32,3 +34,41 @@ class TestLoadInputData(TestCase):
         data = load_input_data(self.data_temp)
         for row in data:
             self.assertEqual(row, collections.OrderedDict([('lat', '52.02'), ('lon', '16.02')]))
+
+
+class TestLoadPoints(TestCase):
+
+    def setUp(self):
+        self.data_temp = StringIO('name,lat,lon\npoint1,52.02,16.02\n')
+
+    def test_load_points(self):
+        points = list(load_points(self.data_temp))
+        self.assertEqual(points, [Point(52.02, 16.02, 'point1')])
+
+    def test_load_unnamed_points(self):
+        data = StringIO('lat,lon\n52.40,16.93\n')
+        self.assertEqual(list(load_points(data)), [Point(52.4, 16.93, '52.40_16.93')])
+
+
+class TestAtomicWrite(TestCase):
+
+    def setUp(self):
+        self.test_dir = mkdtemp()
+        self.path = os.path.join(self.test_dir, 'feature.geojson')
+
+    def tearDown(self):
+        rmtree(self.test_dir)
+
+    def test_atomic_write(self):
+        self.assertEqual(atomic_write(self.path, '{}', fsync=True), self.path)
+        with open(self.path) as f:
+            self.assertEqual(f.read(), '{}')
+        self.assertEqual(os.listdir(self.test_dir), ['feature.geojson'])
+
+    def test_failed_write_keeps_old_file(self):
+        atomic_write(self.path, 'old')
+        with self.assertRaises(TypeError):
+            atomic_write(self.path, None)
+        with open(self.path) as f:
+            self.assertEqual(f.read(), 'old')
+        self.assertEqual(os.listdir(self.test_dir), ['feature.geojson'])
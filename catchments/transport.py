@@ -0,0 +1,351 @@
+import math
+import threading
+import time
+from collections import Counter, deque
+from urllib.parse import urlsplit
+
+
+class TransportError(Exception):
+    """Request wasn't sent or was abandoned by the transport."""
+
+
+class DeadlineExceeded(TransportError):
+    """Overall batch deadline has passed."""
+
+
+class CircuitOpenError(TransportError):
+    """Request rejected, because endpoint's circuit breaker is open."""
+
+
+class Deadline(object):
+    """Overall time budget shared by all requests of a batch run.
+
+    :param seconds (float): budget counted from Deadline creation
+    """
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self):
+        """Returns seconds left (0 if deadline has passed)."""
+
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self):
+        return self.remaining() <= 0
+
+
+def percentile(samples, p):
+    """Returns p-th percentile (nearest-rank) of given samples."""
+
+    ordered = sorted(samples)
+    rank = int(math.ceil(p / 100.0 * len(ordered))) - 1
+
+    return ordered[min(max(rank, 0), len(ordered) - 1)]
+
+
+def is_endpoint_failure(error):
+    """Returns True if error means the endpoint itself is failing.
+
+    Connection errors, timeouts, 5xx and 429 responses count as endpoint
+    failures, other 4xx responses are caused by the request.
+    """
+
+    response = getattr(error, 'response', None)
+    if response is None:
+        return True
+
+    return response.status_code >= 500 or response.status_code == 429
+
+
+class RateLimiter(object):
+    """Token bucket rate limiter, shared by all threads using it.
+
+    :param rate (float): requests per second
+
+    :param burst (int): maximum number of requests sent at once
+    """
+
+    def __init__(self, rate, burst=1):
+        self.rate = float(rate)
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Blocks until request may be sent."""
+
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.burst, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class Transport(object):
+    """Sends API requests with timeouts, batch deadline and hedging.
+
+    :param timeout (tuple): (connect, read) timeouts in seconds,
+        None disables timeouts
+
+    :param deadline (Deadline): overall batch deadline, requests are
+        not sent after it has passed and timeouts are clamped to it
+
+    :param hedge_percentile (float): if set, a duplicate request is sent
+        when the first one hasn't answered within this percentile of
+        observed latencies, first successful response wins
+
+    :param hedge_min_samples (int): latencies observed before hedging starts
+
+    :param session (requests.Session): session to send requests with,
+        requests.get is used if not supplied
+
+    :param max_workers (int): threads sending hedged requests, should be
+        at least twice the number of concurrent callers
+
+    :param breaker_factory (callable): creates CircuitBreaker for every
+        endpoint requests are sent to, None disables breakers
+
+    :param park (bool): wait for open breaker to let trial calls through
+        instead of failing fast
+
+    :param rate_limiter (RateLimiter): limits requests sent (hedged ones included)
+    """
+
+    def __init__(self, timeout=(3.05, 30), deadline=None, hedge_percentile=None,
+                 hedge_min_samples=20, session=None, max_workers=8,
+                 breaker_factory=None, park=False, rate_limiter=None):
+        self.timeout = timeout
+        self.deadline = deadline
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.session = session
+        self.max_workers = max_workers
+        self.breaker_factory = breaker_factory
+        self.park = park
+        self.rate_limiter = rate_limiter
+        self.breakers = {}
+        self.stats = Counter()
+        self.latencies = deque(maxlen=1000)
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def _count(self, key, value=1):
+        with self._lock:
+            self.stats[key] += value
+
+    def _timeout(self):
+        if self.deadline is None:
+            return self.timeout
+
+        remaining = self.deadline.remaining()
+        if self.timeout is None:
+            return (remaining, remaining)
+
+        connect, read = self.timeout
+
+        return (min(connect, remaining), min(read, remaining))
+
+    def hedge_delay(self):
+        """Returns seconds to wait before hedging, None if hedging is off."""
+
+        if self.hedge_percentile is None:
+            return None
+
+        with self._lock:
+            if len(self.latencies) < self.hedge_min_samples:
+                return None
+            samples = list(self.latencies)
+
+        return percentile(samples, self.hedge_percentile)
+
+    def _send(self, url, params, timeout, sent=None):
+        import requests
+
+        get = self.session.get if self.session is not None else requests.get
+
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+
+        if sent is not None:
+            sent.set()
+
+        self._count('sent')
+        started = time.monotonic()
+        try:
+            r = get(url, params=params, timeout=timeout)
+            r.raise_for_status()
+        except requests.Timeout:
+            self._count('timeouts')
+            raise
+        except requests.RequestException:
+            self._count('errors')
+            raise
+
+        with self._lock:
+            self.latencies.append(time.monotonic() - started)
+
+        return r
+
+    def _hedged_send(self, url, params, timeout, delay):
+        from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers)
+
+        sent = threading.Event()
+        first = self._executor.submit(self._send, url, params, timeout, sent)
+        first.add_done_callback(lambda future: sent.set())
+
+        # Hedge delay is counted from sending the request, time spent
+        # waiting for an executor thread or rate limiter doesn't count
+        sent.wait()
+        done, _ = wait([first], timeout=delay)
+        if done:
+            return first.result()
+
+        self._count('hedged')
+        hedge = self._executor.submit(self._send, url, params, self._timeout())
+
+        pending = {first, hedge}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    r = future.result()
+                except Exception as e:
+                    error = e
+                    continue
+                if future is hedge:
+                    self._count('hedge_wins')
+                return r
+
+        raise error
+
+    def breaker(self, url, endpoint=None):
+        """Returns circuit breaker of url's endpoint, None if breakers are off.
+
+        :param url (string)
+
+        :param endpoint (string): endpoint id (e.g. provider name), url's host
+            is used if not supplied. Endpoint ids are listed in summary(),
+            so they shouldn't contain secrets (SKOBBLER host contains API key).
+        """
+
+        if self.breaker_factory is None:
+            return None
+
+        if endpoint is None:
+            # Credentials in url are never used as a key
+            endpoint = urlsplit(url).netloc.rpartition('@')[2]
+
+        with self._lock:
+            breaker = self.breakers.get(endpoint)
+            if breaker is None:
+                breaker = self.breakers[endpoint] = self.breaker_factory()
+
+        return breaker
+
+    def _acquire(self, breaker):
+        parked = False
+        while not breaker.allow():
+            if not self.park:
+                self._count('circuit_rejected')
+                raise CircuitOpenError('Circuit breaker is open')
+
+            wait = breaker.wait_time()
+            if self.deadline is not None and wait >= self.deadline.remaining():
+                self._count('deadline_exceeded')
+                raise DeadlineExceeded('Batch deadline has passed')
+
+            if not parked:
+                self._count('parked')
+                parked = True
+            time.sleep(wait)
+
+    def get(self, url, params, endpoint=None):
+        """Sends GET request.
+
+        :param url (string)
+
+        :param params (dictionary): query params
+
+        :param endpoint (string): circuit breaker endpoint id, see breaker()
+
+        Returns:
+            requests.Response if successful
+
+        Raises:
+            requests.RequestException on HTTP, connection or timeout error,
+            DeadlineExceeded if batch deadline has passed,
+            CircuitOpenError if endpoint's circuit breaker is open
+        """
+
+        self._count('requests')
+
+        if self.deadline is not None and self.deadline.expired:
+            self._count('deadline_exceeded')
+            raise DeadlineExceeded('Batch deadline has passed')
+
+        breaker = self.breaker(url, endpoint)
+        if breaker is not None:
+            self._acquire(breaker)
+
+        timeout = self._timeout()
+        delay = self.hedge_delay()
+
+        try:
+            if delay is None:
+                r = self._send(url, params, timeout)
+            else:
+                r = self._hedged_send(url, params, timeout, delay)
+        except Exception as e:
+            if breaker is not None:
+                if is_endpoint_failure(e):
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+            raise
+
+        if breaker is not None:
+            breaker.record_success()
+
+        return r
+
+    def summary(self):
+        """Returns run statistics (dictionary)."""
+
+        with self._lock:
+            summary = dict(self.stats)
+
+        summary['hedge_rate'] = (
+            summary.get('hedged', 0) / summary['requests']
+            if summary.get('requests') else 0.0
+        )
+
+        if self.breakers:
+            summary['breakers'] = dict(
+                (endpoint, breaker.summary())
+                for endpoint, breaker in self.breakers.items()
+            )
+
+        return summary
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        if self.session is not None:
+            self.session.close()
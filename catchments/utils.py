@@ -1,4 +1,10 @@
+import os
 import csv
+import threading
+from functools import partial
+from catchments.models import Point
+from catchments.transport import Transport, Deadline, RateLimiter
+from catchments.breaker import CircuitBreaker
 
 
 def load_input_data(points):
@@ -21,3 +27,185 @@ def load_input_data(points):
     data = csv.DictReader(points, dialect=dialect)
     
     return data
+
+
+def load_points(points):
+    """Reads *.csv file as compact Point objects.
+
+    :param points (file object):
+        *.csv file with
+        'lon' (required),
+        'lat' (required),
+        'name' (optional) columns.
+
+    Returns:
+        generator of Point objects, unnamed points are named 'lat_lon'
+        (as written in the file)
+    """
+
+    for row in load_input_data(points):
+        yield Point.from_dict(row, default_name=True)
+
+
+def create_session(pool_size=10):
+    """Creates requests.Session, which keeps connections to API providers open.
+
+    :param pool_size (int): number of connections kept per host
+
+    Returns:
+        session (requests.Session)
+    """
+
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+
+    return session
+
+
+def create_transport(params):
+    """Creates Transport from parsed commandline arguments.
+
+    All requests are sent with one session (connection pool) and hedged
+    requests with an executor, both sized for 'workers' concurrent requests.
+
+    :param params (dictionary):
+        'connect_timeout', 'timeout', 'deadline', 'hedge',
+        'breaker', 'breaker_reset', 'park', 'rate', 'workers' keys
+
+    Returns:
+        transport (catchments.transport.Transport)
+    """
+
+    deadline = params.get('deadline')
+    breaker = params.get('breaker')
+    rate = params.get('rate')
+    workers = params.get('workers', 4)
+
+    return Transport(
+        timeout=(params.get('connect_timeout', 3.05), params.get('timeout', 30.0)),
+        deadline=Deadline(deadline) if deadline else None,
+        hedge_percentile=params.get('hedge'),
+        breaker_factory=partial(
+            CircuitBreaker,
+            failure_rate=breaker,
+            reset_timeout=params.get('breaker_reset', 30.0),
+        ) if breaker else None,
+        park=params.get('park', False),
+        rate_limiter=RateLimiter(rate) if rate else None,
+        session=create_session(2 * workers),
+        # Every request may be hedged, so every worker may need two threads
+        max_workers=2 * workers,
+    )
+
+
+def create_profiler(params):
+    """Creates Profiler from parsed commandline arguments.
+
+    :param params (dictionary):
+        'profile', 'profile_rate', 'profile_spans_only' keys
+
+    Returns:
+        profiler (catchments.profiling.Profiler) or None if profiling is off
+    """
+
+    if not params.get('profile'):
+        return None
+
+    from catchments.profiling import Profiler
+
+    return Profiler(
+        params['profile'],
+        sample_rate=params.get('profile_rate', 1.0),
+        cprofile=not params.get('profile_spans_only', False),
+    )
+
+
+def format_summary(summary):
+    """Formats run statistics as a single line.
+
+    :param summary (dictionary)
+
+    Returns:
+        line (string)
+    """
+
+    return ', '.join(
+        '{}: {:.2f}'.format(key, value) if isinstance(value, float)
+        else '{}: {}'.format(key, value)
+        for key, value in sorted(summary.items())
+    )
+
+
+def atomic_write(path, data, fsync=False):
+    """Writes data to file atomically.
+
+    Data is written to a temporary file in the same directory, which is
+    then renamed to path, so the file is never left half-written.
+
+    :param path (path)
+
+    :param data (string)
+
+    :param fsync (bool): flush file to disk before renaming
+
+    Returns:
+        path
+    """
+
+    directory, name = os.path.split(path)
+    tmp_path = os.path.join(directory, '.{}.{}-{}.tmp'.format(
+        name, os.getpid(), threading.get_ident()
+    ))
+
+    try:
+        with open(tmp_path, 'w', buffering=1 << 16) as f:
+            f.write(data)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+    return path
+
+
+def print_report(status, point, detail=None):
+    """Prints status of processed point (used by command line scripts).
+
+    :param status (string): Pipeline report status
+
+    :param point (dictionary or Point)
+
+    :param detail: file path or exception
+    """
+
+    if status == 'created':
+        print('{} file has been created.'.format(detail))
+    elif status == 'invalid':
+        print('Couldn\'t proccess catchment for {},{} to GeoJSON (Invalid API response)'.format(
+            point.get('lat'), point.get('lon')
+        ))
+    elif status == 'http_error':
+        print('Couldn\'t get catchment for {},{} coordinates (HTTP Error).'.format(
+            point['lat'], point['lon']
+        ))
+    elif status == 'write_error':
+        print('Couldn\'t save catchment for {},{} ({}).'.format(
+            point['lat'], point['lon'], detail
+        ))
+    elif status == 'error':
+        print('Couldn\'t process catchment for {},{} ({!r}).'.format(
+            point['lat'], point['lon'], detail
+        ))
+    elif status == 'deadline_exceeded':
+        print('Batch deadline exceeded, remaining points skipped.')
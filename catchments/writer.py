@@ -0,0 +1,103 @@
+import logging
+import queue
+import threading
+from catchments.models import Catchment
+from catchments.profiling import span
+
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class GeoJSONWriter(object):
+    """Saves GeoJSON features with a pool of writer threads.
+
+    Features are put into a bounded queue (producers block when it is
+    full) and saved by several threads at once, so filesystem latency
+    (e.g. of network filesystems) doesn't slow down requesting catchments.
+
+    :param queue_size (int): maximum number of features waiting to be saved
+
+    :param threads (int): number of writer threads
+
+    :param report (callable): called with (status, point, detail, group)
+        after every feature, status is 'created' (detail - file path)
+        or 'write_error' (detail - exception, unexpected ones are logged)
+    """
+
+    def __init__(self, queue_size=1000, threads=4, report=None):
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.threads = threads
+        self.report = report
+        self._threads = []
+
+    def start(self):
+        for i in range(self.threads):
+            thread = threading.Thread(
+                target=self._run, name='catchments-writer_{}'.format(i), daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+        return self
+
+    def write(self, api, feature, point=None, save_in=None, group=None):
+        """Queues feature to be saved with api.save_as_geojson.
+
+        :param api (API object)
+
+        :param feature (Catchment or dictionary - GeoJSON feature): GeoJSON
+            of Catchment is built (with api.catchment_as_geojson) by writer thread
+
+        :param point (dictionary or Point): passed to report callback
+
+        :param save_in (path)
+
+        :param group (hashable): passed to report callback
+        """
+
+        self.queue.put((api, feature, point, save_in, group))
+
+    def close(self):
+        """Saves queued features and stops writer threads."""
+
+        for _ in self._threads:
+            self.queue.put(_STOP)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _save(self, api, feature, point, save_in, group):
+        try:
+            with span('write', point):
+                if isinstance(feature, Catchment):
+                    feature = api.catchment_as_geojson(feature)
+                path = api.save_as_geojson(feature, save_in=save_in)
+        except (OSError, ValueError) as e:
+            status, detail = 'write_error', e
+        except Exception as e:
+            # Writer threads must keep running, producers would block otherwise
+            logger.exception('Couldn\'t save feature of point %r', point)
+            status, detail = 'write_error', e
+        else:
+            status, detail = 'created', path
+
+        if self.report is not None:
+            try:
+                self.report(status, point, detail, group)
+            except Exception:
+                logger.exception('Report callback failed')
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            if item is _STOP:
+                return
+            self._save(*item)
@@ -29,7 +29,11 @@ setup(
     ],
     zip_safe=False,
     include_package_data=True,
-    scripts=['bin/catchments-skobbler.py', 'bin/catchments-here.py'],
+    scripts=[
+        'bin/catchments-skobbler.py',
+        'bin/catchments-here.py',
+        'bin/catchments-server.py',
+    ],
     test_suite='nose.collector',
     tests_require=['nose', 'requests']
 )